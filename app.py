@@ -3,13 +3,24 @@ Lead Generation Web Agent - Main Streamlit Dashboard
 """
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import io
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from database import init_db, SessionLocal, Lead, LeadRepository
-from scrapers.pubmed_scraper import PubMedScraper
+from database import init_db, SessionLocal, Lead, LeadRepository, get_table_version
+from scrapers.pubmed_scraper import PubMedScraper, chunked
 from scoring.propensity_scorer import PropensityScorer
 from enrichment.email_finder import EmailFinder
-from config import PUBMED_KEYWORDS
+from config import PUBMED_KEYWORDS, get_settings
+
+# Maximum number of leads offered in the details selectbox
+LEAD_SELECT_LIMIT = 1000
+
+# Worker threads used to enrich scraped leads
+ENRICH_WORKERS = 8
+
+# Scraped leads enriched and inserted per database transaction
+LEAD_BATCH_SIZE = 100
 
 # Page configuration
 st.set_page_config(
@@ -19,8 +30,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS for better styling (page layout, lead cards and the download button)
+_CSS = """
 <style>
     .stApp {
         max-width: 100%;
@@ -48,8 +59,26 @@ st.markdown("""
         border-radius: 0.5rem;
         text-align: center;
     }
+    .stDownloadButton > button {
+        width: 100%;
+        background-color: transparent;
+        color: white;
+        border: 2px solid #404040;
+        border-radius: 8px;
+        padding: 12px 24px;
+        font-size: 16px;
+        font-weight: 500;
+        cursor: pointer;
+        transition: all 0.3s ease;
+    }
+    .stDownloadButton > button:hover {
+        background-color: #2d2d2d;
+        border-color: #505050;
+    }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 
 def init_session_state():
@@ -62,43 +91,86 @@ def init_session_state():
         st.session_state.leads_loaded = False
 
 
-def get_score_emoji(score: float) -> str:
-    """Get emoji for score"""
-    if score >= 80:
-        return "🟢"
-    elif score >= 50:
-        return "🟡"
-    else:
-        return "⚪"
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def get_lead_stats(_repo: LeadRepository, db_url: str, table_version: int) -> tuple:
+    """Get (total, hot, warm, cold) lead counts, cached across reruns until the leads change"""
+    return _repo.get_lead_stats()
+
+
+@st.cache_resource
+def get_scraper() -> PubMedScraper:
+    """Get the PubMed scraper shared by all sessions"""
+    return PubMedScraper()
+
+
+@st.cache_resource
+def get_scorer() -> PropensityScorer:
+    """Get the propensity scorer shared by all sessions"""
+    return PropensityScorer()
+
+
+@st.cache_resource
+def get_email_finder() -> EmailFinder:
+    """Get the email finder shared by all sessions"""
+    return EmailFinder()
 
 
-def get_score_category(score: float) -> str:
-    """Get category for score"""
-    if score >= 80:
-        return "Hot Lead"
-    elif score >= 50:
-        return "Warm Lead"
-    else:
-        return "Cold Lead"
+# (emoji, category, CSS class) per score bucket: cold < 50 <= warm < 80 <= hot
+_SCORE_BUCKETS = (
+    ("⚪", "Cold Lead", "cold-lead"),
+    ("🟡", "Warm Lead", "warm-lead"),
+    ("🟢", "Hot Lead", "hot-lead"),
+)
+
+
+def score_info(score: float) -> tuple:
+    """Get (emoji, category, CSS class) for a score"""
+    return _SCORE_BUCKETS[(score >= 80) + (score >= 50)]
+
+
+def enrich_lead(email_finder: EmailFinder, lead_data: dict) -> dict:
+    """Get email, LinkedIn search link and conference suggestions for a lead"""
+    return {
+        # Generate email
+        'email': email_finder.generate_email(lead_data['name'], lead_data['company']),
+        # Generate LinkedIn URL (Search Link)
+        'linkedin_url': email_finder.generate_linkedin_url(lead_data['name'], lead_data['company']),
+        # Generate conference suggestions
+        'conference_participation': email_finder.suggest_conferences(
+            lead_data.get('title', ''), lead_data.get('publications', [])
+        ),
+    }
+
 
+def track_progress(items, total: int, progress, label: str):
+    """Yield items while updating a progress bar every 10 items"""
+    for done, item in enumerate(items, 1):
+        if done % 10 == 0 or done == total:
+            progress.progress(min(done / total, 1.0), text=f"Processed {done}/{total} {label}")
+        yield item
 
-def get_score_class(score: float) -> str:
-    """Get CSS class for score"""
-    if score >= 80:
-        return "hot-lead"
-    elif score >= 50:
-        return "warm-lead"
-    else:
-        return "cold-lead"
+
+def store_lead_batch(repo: LeadRepository, scorer: PropensityScorer, leads: list) -> int:
+    """Score and insert one batch of enriched leads; returns the number added"""
+    # Calculate scores for the whole batch
+    for lead_data, scores in zip(leads, scorer.calculate_total_scores(leads)):
+        lead_data.update(scores)
+    
+    # Skip leads that are already stored, then add the rest in one transaction
+    try:
+        return repo.insert_new_leads(leads)
+    except Exception as e:
+        st.error(f"Could not add leads to the database: {e}")
+        return 0
 
 
-def scrape_pubmed_leads(query: str = None):
+def scrape_pubmed_leads(db, query: str = None):
     """Scrape leads from PubMed"""
     search_terms = [query] if query else PUBMED_KEYWORDS
     with st.spinner(f"Searching PubMed for papers related to: {', '.join(search_terms)}..."):
-        scraper = PubMedScraper()
-        scorer = PropensityScorer()
-        email_finder = EmailFinder()
+        scraper = get_scraper()
+        scorer = get_scorer()
+        email_finder = get_email_finder()
         
         # Search for papers
         paper_ids = scraper.search_papers(search_terms, months_back=24, max_results=100)
@@ -109,110 +181,88 @@ def scrape_pubmed_leads(query: str = None):
         
         st.info(f"Found {len(paper_ids)} papers")
         
-        # Fetch paper details
-        papers = scraper.fetch_paper_details(paper_ids)
-        st.info(f"Fetched details for {len(papers)} papers")
+        # Stream paper details into leads; leads are held until all papers are merged
+        progress = st.progress(0.0, text="Fetching paper details...")
+        papers = track_progress(scraper.fetch_paper_details(paper_ids), len(paper_ids), progress, "papers")
+        leads = list(scraper.extract_leads_from_papers(papers))
+        lead_count = len(leads)
         
-        # Extract leads
-        leads = scraper.extract_leads_from_papers(papers)
-        st.info(f"Extracted {len(leads)} unique leads")
-        
-        # Enrich and score leads
-        db = SessionLocal()
+        # Enrich leads concurrently so network-backed lookups overlap; the same bar then
+        # advances as each enrichment completes, while leads are scored and stored batch by batch
         repo = LeadRepository(db)
+        progress.progress(0.0, text="Enriching leads...")
         
         added_count = 0
-        for lead_data in leads:
-            # Generate email
-            email = email_finder.generate_email(lead_data['name'], lead_data['company'])
-            lead_data['email'] = email
-            
-            # Generate LinkedIn URL (Search Link)
-            linkedin_url = email_finder.generate_linkedin_url(lead_data['name'], lead_data['company'])
-            lead_data['linkedin_url'] = linkedin_url
-            
-            # Generate conference suggestions
-            publications = lead_data.get('publications', [])
-            conferences = email_finder.suggest_conferences(lead_data.get('title', ''), publications)
-            lead_data['conference_participation'] = conferences
-            
-            # Convert publications to JSON string
-            if 'publications' in lead_data:
-                lead_data['publications'] = json.dumps(lead_data['publications'])
-            
-            # Calculate scores
-            scores = scorer.calculate_total_score(lead_data)
-            lead_data.update(scores)
-            
-            # Add to database
-            try:
-                repo.create_lead(lead_data)
-                added_count += 1
-            except Exception as e:
-                st.warning(f"Could not add lead {lead_data['name']}: {e}")
-        
-        db.close()
+        with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
+            enrichments = executor.map(lambda lead: enrich_lead(email_finder, lead), leads)
+            enriched = track_progress(zip(leads, enrichments), lead_count, progress, "leads")
+            for batch in chunked(enriched, LEAD_BATCH_SIZE):
+                for lead_data, enrichment in batch:
+                    lead_data.update(enrichment)
+                added_count += store_lead_batch(repo, scorer, [lead_data for lead_data, _ in batch])
         
+        st.info(f"Extracted {lead_count} unique leads")
         st.success(f"Successfully added {added_count} leads to the database!")
         st.session_state.leads_loaded = True
 
 
-def display_leads_table(leads: list):
-    """Display leads in a table format"""
-    if not leads:
-        st.info("No leads found. Try scraping PubMed or adjusting your filters.")
-        return
+def _or_default(values: pd.Series, default: str) -> pd.Series:
+    """Replace missing or empty values with a default, like `value or default`"""
+    return values.where(values.notna() & (values != ''), default)
+
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def build_leads_df(_repo: LeadRepository, db_url: str, table_version: int,
+                   search_term: str, min_score: float, max_score: float) -> tuple:
+    """
+    Load and format the leads table for a set of filters
+    Returns the top 500 rows and the total number of matching leads
+    """
+    filters = {
+        'search_term': search_term if search_term else None,
+        'min_score': min_score,
+        'max_score': max_score,
+    }
     
-    # Convert to DataFrame
-    data = []
+    # The database returns only the top 500 leads by score
+    df = _repo.search_leads_df(limit=500, **filters)
+    total_found = _repo.count_leads(**filters)
     
-    # Sort leads by score (just in case they aren't already) but they typically are from the DB query
-    # Then take only top 500
-    sorted_leads = sorted(leads, key=lambda x: x.total_score, reverse=True)[:500]
+    # Format link for action (research)
+    research_link = (
+        "https://www.google.com/search?q=" + df['name'] + " " + df['company'] + " " + df['title'] + " contact"
+    )
     
-    for lead in sorted_leads:
-        # Parse publications
-        pub_count = 0
-        if lead.publications:
-            try:
-                pubs = json.loads(lead.publications)
-                pub_count = len(pubs)
-            except:
-                pass
-        
-        # Construct Platform URL (e.g., PubMed search)
-        platform_url = "https://pubmed.ncbi.nlm.nih.gov/"
-        if lead.data_source == 'PubMed':
-             platform_url = f"https://pubmed.ncbi.nlm.nih.gov/?term={lead.name.replace(' ', '+')}"
-        
-        # Format conferences with link if available
-        conferences = lead.conference_participation or 'N/A'
-        conference_link = conferences
-        if conferences != 'N/A':
-             # Create a broad search link for the person and these conferences
-             import urllib.parse
-             query = f"{lead.name} {lead.company} {conferences} conference attendance"
-             encoded_query = urllib.parse.quote(query)
-             conference_link = f"https://www.google.com/search?q={encoded_query}"
-
-        # Format link for action (research)
-        research_link = f"https://www.google.com/search?q={lead.name} {lead.company} {lead.title} contact"
-        
-        data.append({
-            'Rank': len(data) + 1,
-            'Probability': f"{lead.total_score:.1f}",  # Removed emoji for cleaner look
-            'Name': lead.name,
-            'Title': lead.title,
-            'Company': lead.company,
-            'Location': lead.person_location or 'Unknown',
-            'HQ': lead.company_hq or 'Unknown',  # Added HQ column
-            'Email': lead.email or 'N/A',
-            'LinkedIn': lead.linkedin_url or 'N/A',
-            'Action': research_link,  # Use search link as action for now
-            'ID': lead.id
-        })
+    df = pd.DataFrame({
+        'Rank': np.arange(1, len(df) + 1),
+        'Probability': df['total_score'].round(1),
+        'Name': df['name'],
+        'Title': df['title'],
+        'Company': df['company'],
+        'Location': _or_default(df['person_location'], 'Unknown'),
+        'HQ': _or_default(df['company_hq'], 'Unknown'),
+        'Email': _or_default(df['email'], 'N/A'),
+        'LinkedIn': _or_default(df['linkedin_url'], 'N/A'),
+        'Action': research_link,  # Use search link as action for now
+        'ID': df['id'],
+    })
     
-    df = pd.DataFrame(data)
+    return df, total_found
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_leads_csv(df: pd.DataFrame) -> bytes:
+    """Encode the leads table as CSV for download, without internal columns"""
+    buf = io.BytesIO()
+    df.drop('ID', axis=1).to_csv(buf, index=False, encoding='utf-8-sig', lineterminator='\n')
+    return buf.getvalue()
+
+
+def render_leads_df(df: pd.DataFrame):
+    """Display leads in a table format"""
+    if df.empty:
+        st.info("No leads found. Try scraping PubMed or adjusting your filters.")
+        return
     
     # Display table with requested columns
     st.dataframe(
@@ -235,31 +285,7 @@ def display_leads_table(leads: list):
     )
     
     # Export button with custom styling
-    # Create export DF without internal columns
-    export_df = df.drop('ID', axis=1)
-    csv = export_df.to_csv(index=False).encode('utf-8-sig')
-    
-    # Custom styled download button
-    st.markdown("""
-    <style>
-    .stDownloadButton > button {
-        width: 100%;
-        background-color: transparent;
-        color: white;
-        border: 2px solid #404040;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-size: 16px;
-        font-weight: 500;
-        cursor: pointer;
-        transition: all 0.3s ease;
-    }
-    .stDownloadButton > button:hover {
-        background-color: #2d2d2d;
-        border-color: #505050;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    csv = build_leads_csv(df)
     
     st.download_button(
         label="📥 Download Qualified Leads (CSV)",
@@ -275,10 +301,10 @@ def display_lead_details(lead: Lead):
     st.subheader(f"{lead.name}")
     
     # Score card
-    score_class = get_score_class(lead.total_score)
+    emoji, category, score_class = score_info(lead.total_score)
     st.markdown(f"""
     <div class="lead-card {score_class}">
-        <h3>{get_score_emoji(lead.total_score)} {lead.total_score:.1f}/100 - {get_score_category(lead.total_score)}</h3>
+        <h3>{emoji} {lead.total_score:.1f}/100 - {category}</h3>
     </div>
     """, unsafe_allow_html=True)
     
@@ -315,14 +341,13 @@ def display_lead_details(lead: Lead):
     
     # Publications
     if lead.publications:
-        st.subheader("Publications")
-        try:
-            pubs = json.loads(lead.publications)
-            for pub in pubs:
+        st.subheader(f"Publications ({lead.pub_count or 0})")
+        if isinstance(lead.publications, list):
+            for pub in lead.publications:
                 st.write(f"- **{pub.get('title', 'N/A')}** ({pub.get('year', 'N/A')})")
                 if 'pubmed_id' in pub:
                     st.write(f"  PubMed ID: {pub['pubmed_id']}")
-        except:
+        else:
             st.write(lead.publications)
     
     # Notes
@@ -339,88 +364,79 @@ def main():
     st.title("🎯 Lead Generation Dashboard")
     st.markdown("**Intelligent lead identification and ranking for 3D in-vitro models**")
     
-    # Sidebar
-    with st.sidebar:
-        st.header("Controls")
-        
-        st.divider()
-        
-        # Filters
-        st.header("Filters")
-        
-        score_range = st.slider(
-            "Score Range",
-            min_value=0.0,
-            max_value=100.0,
-            value=(0.0, 100.0),
-            step=5.0
-        )
-        
-        search_term = st.text_input("Search (Name, Title, Company, Location) - Press Enter to search")
-        
-        # Live Scrape Option
-        if search_term and st.button(f"🔍 Scrape '{search_term}'", use_container_width=True):
-             scrape_pubmed_leads(search_term)
-        
-        st.divider()
-        
-        # Stats
-        st.header("Statistics")
-        db = SessionLocal()
-        repo = LeadRepository(db)
-        all_leads = repo.get_all_leads()
-        
-        total_leads = len(all_leads)
-        hot_leads = len([l for l in all_leads if l.total_score >= 80])
-        warm_leads = len([l for l in all_leads if 50 <= l.total_score < 80])
-        cold_leads = len([l for l in all_leads if l.total_score < 50])
-        
-        st.metric("Total Leads", total_leads)
-        st.metric("🟢 Hot Leads", hot_leads)
-        st.metric("🟡 Warm Leads", warm_leads)
-        st.metric("⚪ Cold Leads", cold_leads)
-        
-        db.close()
-    
-    # Main content
-    tab1, tab2 = st.tabs(["📊 All Leads", "🔍 Lead Details"])
-    
-    with tab1:
-        # Get filtered leads
-        db = SessionLocal()
+    # One database session for the whole render
+    with SessionLocal() as db:
         repo = LeadRepository(db)
         
-        leads = repo.search_leads(
-            search_term=search_term if search_term else None,
-            min_score=score_range[0],
-            max_score=score_range[1]
-        )
+        # Sidebar
+        with st.sidebar:
+            st.header("Controls")
+            
+            st.divider()
+            
+            # Filters
+            st.header("Filters")
+            
+            score_range = st.slider(
+                "Score Range",
+                min_value=0.0,
+                max_value=100.0,
+                value=(0.0, 100.0),
+                step=5.0
+            )
+            
+            search_term = st.text_input("Search (Name, Title, Company, Location) - Press Enter to search")
+            
+            # Live Scrape Option
+            if search_term and st.button(f"🔍 Scrape '{search_term}'", use_container_width=True):
+                 scrape_pubmed_leads(db, search_term)
+            
+            st.divider()
+            
+            # Stats
+            st.header("Statistics")
+            total_leads, hot_leads, warm_leads, cold_leads = get_lead_stats(
+                repo, get_settings().DATABASE_URL, get_table_version()
+            )
+            
+            st.metric("Total Leads", total_leads)
+            st.metric("🟢 Hot Leads", hot_leads)
+            st.metric("🟡 Warm Leads", warm_leads)
+            st.metric("⚪ Cold Leads", cold_leads)
         
-        st.subheader(f"Leads ({len(leads)} found)")
-        display_leads_table(leads)
+        # Main content
+        tab1, tab2 = st.tabs(["📊 All Leads", "🔍 Lead Details"])
         
-        db.close()
-    
-    with tab2:
-        # Lead selector
-        db = SessionLocal()
-        repo = LeadRepository(db)
-        all_leads = repo.get_all_leads()
+        with tab1:
+            # Get filtered leads
+            leads_df, total_found = build_leads_df(
+                repo,
+                get_settings().DATABASE_URL,
+                get_table_version(),
+                search_term,
+                score_range[0],
+                score_range[1]
+            )
+            
+            st.subheader(f"Leads ({total_found} found)")
+            render_leads_df(leads_df)
         
-        if all_leads:
-            lead_options = {f"{lead.name} - {lead.company}": lead.id for lead in all_leads}
-            selected_lead_name = st.selectbox("Select a lead", list(lead_options.keys()))
+        with tab2:
+            # Lead selector
+            lead_rows = repo.list_lead_names_ids(limit=LEAD_SELECT_LIMIT)
             
-            if selected_lead_name:
-                lead_id = lead_options[selected_lead_name]
-                lead = repo.get_lead(lead_id)
+            if lead_rows:
+                lead_options = {f"{name} - {company}": lead_id for lead_id, name, company in lead_rows}
+                selected_lead_name = st.selectbox("Select a lead", list(lead_options.keys()))
                 
-                if lead:
-                    display_lead_details(lead)
-        else:
-            st.info("No leads available. Scrape PubMed to get started!")
-        
-        db.close()
+                if selected_lead_name:
+                    lead_id = lead_options[selected_lead_name]
+                    lead = repo.get_lead(lead_id)
+                    
+                    if lead:
+                        display_lead_details(lead)
+            else:
+                st.info("No leads available. Scrape PubMed to get started!")
 
 
 if __name__ == "__main__":
@@ -4,10 +4,10 @@ Matches the reference design with dark theme and professional layout
 """
 import streamlit as st
 import pandas as pd
-import json
 from datetime import datetime
+from operator import attrgetter
 from database import init_db, SessionLocal, Lead, LeadRepository
-from scrapers.pubmed_scraper import PubMedScraper
+from scrapers.pubmed_scraper import PubMedScraper, chunked
 from scoring.propensity_scorer import PropensityScorer
 from enrichment.email_finder import EmailFinder
 from config import PUBMED_KEYWORDS
@@ -107,44 +107,49 @@ def scrape_pubmed_leads():
         
         st.info(f"Found {len(paper_ids)} papers")
         
-        # Fetch paper details
+        # Stream paper details into leads
         papers = scraper.fetch_paper_details(paper_ids)
-        st.info(f"Fetched details for {len(papers)} papers")
-        
-        # Extract leads
         leads = scraper.extract_leads_from_papers(papers)
-        st.info(f"Extracted {len(leads)} unique leads")
         
-        # Enrich and score leads
+        # Enrich, score and store leads batch by batch
         db = SessionLocal()
         repo = LeadRepository(db)
         
+        lead_count = 0
         added_count = 0
-        for lead_data in leads:
-            # Generate email
-            email = email_finder.generate_email(lead_data['name'], lead_data['company'])
-            lead_data['email'] = email
+        for batch in chunked(leads, 100):
+            lead_count += len(batch)
             
-            # Convert publications to JSON string
-            if 'publications' in lead_data:
-                lead_data['publications'] = json.dumps(lead_data['publications'])
+            records = []
+            for lead_data in batch:
+                # Generate email
+                email = email_finder.generate_email(lead_data['name'], lead_data['company'])
+                lead_data['email'] = email
+                
+                records.append(lead_data)
             
-            # Calculate scores
-            scores = scorer.calculate_total_score(lead_data)
-            lead_data.update(scores)
+            # Calculate scores for the whole batch
+            for lead_data, scores in zip(records, scorer.calculate_total_scores(records)):
+                lead_data.update(scores)
             
-            # Add to database
+            # Skip leads that are already stored, then add the rest in one transaction
             try:
-                repo.create_lead(lead_data)
-                added_count += 1
+                added_count += repo.insert_new_leads(records)
             except Exception as e:
-                pass
+                st.error(f"Could not add leads to the database: {e}")
         
         db.close()
         
+        st.info(f"Extracted {lead_count} unique leads")
         st.success(f"Successfully added {added_count} leads to the database!")
 
 
+# Lead attributes read per table row, fetched in one C-level call
+_ROW_GET = attrgetter(
+    'total_score', 'name', 'title', 'company', 'person_location', 'company_hq', 'email'
+)
+
+
 def display_leads_dashboard(leads: list):
     """Display leads in dashboard format matching reference design"""
     if not leads:
@@ -154,19 +159,21 @@ def display_leads_dashboard(leads: list):
     # Prepare data for table
     data = []
     for idx, lead in enumerate(leads, 1):
+        score, name, title, company, location, hq, email = _ROW_GET(lead)
+        
         # Determine work mode based on location
-        work_mode = "Remote" if lead.person_location and lead.company_hq and lead.person_location != lead.company_hq else "Onsite"
+        work_mode = "Remote" if location and hq and location != hq else "Onsite"
         
         data.append({
             'rank': idx,
-            'probability_score': int(lead.total_score),
-            'name': lead.name,
-            'title': lead.title,
-            'company': lead.company,
-            'person_location': lead.person_location or 'Unknown',
-            'company_hq': lead.company_hq or lead.person_location or 'Unknown',
+            'probability_score': int(score),
+            'name': name,
+            'title': title,
+            'company': company,
+            'person_location': location or 'Unknown',
+            'company_hq': hq or location or 'Unknown',
             'work_mode': work_mode,
-            'email': lead.email or 'N/A'
+            'email': email or 'N/A'
         })
     
     df = pd.DataFrame(data)
@@ -242,14 +249,20 @@ def main():
     
     # Apply filters
     if search_text:
-        leads = repo.search_leads(
-            name=search_text,
-            company=search_text,
-            location=search_text,
-            min_score=min_score
-        )
+        filters = {
+            'name': search_text,
+            'company': search_text,
+            'location': search_text,
+            'min_score': min_score,
+        }
     else:
-        leads = repo.search_leads(min_score=min_score)
+        filters = {'min_score': min_score}
+    
+    # search_leads returns only the top-scored leads; say so when there are more matches
+    leads = repo.search_leads(**filters)
+    total_found = repo.count_leads(**filters)
+    if total_found > len(leads):
+        st.caption(f"Showing the top {len(leads)} of {total_found} matching leads by score")
     
     # Display dashboard
     display_leads_dashboard(leads)
@@ -3,10 +3,9 @@ Lead Generation Web Agent - Main Streamlit Dashboard
 """
 import streamlit as st
 import pandas as pd
-import json
 from datetime import datetime
 from database import init_db, SessionLocal, Lead, LeadRepository
-from scrapers.pubmed_scraper import PubMedScraper
+from scrapers.pubmed_scraper import PubMedScraper, chunked
 from scoring.propensity_scorer import PropensityScorer
 from enrichment.email_finder import EmailFinder
 from config import PUBMED_KEYWORDS
@@ -108,41 +107,37 @@ def scrape_pubmed_leads():
         
         st.info(f"Found {len(paper_ids)} papers")
         
-        # Fetch paper details
+        # Stream paper details into leads
         papers = scraper.fetch_paper_details(paper_ids)
-        st.info(f"Fetched details for {len(papers)} papers")
-        
-        # Extract leads
         leads = scraper.extract_leads_from_papers(papers)
-        st.info(f"Extracted {len(leads)} unique leads")
         
-        # Enrich and score leads
+        # Enrich, score and store leads batch by batch
         db = SessionLocal()
         repo = LeadRepository(db)
         
+        lead_count = 0
         added_count = 0
-        for lead_data in leads:
-            # Generate email
-            email = email_finder.generate_email(lead_data['name'], lead_data['company'])
-            lead_data['email'] = email
+        for batch in chunked(leads, 100):
+            lead_count += len(batch)
             
-            # Convert publications to JSON string
-            if 'publications' in lead_data:
-                lead_data['publications'] = json.dumps(lead_data['publications'])
+            for lead_data in batch:
+                # Generate email
+                email = email_finder.generate_email(lead_data['name'], lead_data['company'])
+                lead_data['email'] = email
             
-            # Calculate scores
-            scores = scorer.calculate_total_score(lead_data)
-            lead_data.update(scores)
+            # Calculate scores for the whole batch
+            for lead_data, scores in zip(batch, scorer.calculate_total_scores(batch)):
+                lead_data.update(scores)
             
-            # Add to database
+            # Skip leads that are already stored, then add the rest in one transaction
             try:
-                repo.create_lead(lead_data)
-                added_count += 1
+                added_count += repo.insert_new_leads(batch)
             except Exception as e:
-                st.warning(f"Could not add lead {lead_data['name']}: {e}")
+                st.error(f"Could not add leads to the database: {e}")
         
         db.close()
         
+        st.info(f"Extracted {lead_count} unique leads")
         st.success(f"Successfully added {added_count} leads to the database!")
         st.session_state.leads_loaded = True
 
@@ -156,15 +151,6 @@ def display_leads_table(leads: list):
     # Convert to DataFrame
     data = []
     for lead in leads:
-        # Parse publications
-        pub_count = 0
-        if lead.publications:
-            try:
-                pubs = json.loads(lead.publications)
-                pub_count = len(pubs)
-            except:
-                pass
-        
         data.append({
             'Score': f"{get_score_emoji(lead.total_score)} {lead.total_score:.1f}",
             'Name': lead.name,
@@ -172,7 +158,7 @@ def display_leads_table(leads: list):
             'Company': lead.company,
             'Location': lead.person_location or 'Unknown',
             'Email': lead.email or 'N/A',
-            'Publications': pub_count,
+            'Publications': lead.pub_count or 0,
             'Category': get_score_category(lead.total_score),
             'ID': lead.id
         })
@@ -259,13 +245,12 @@ def display_lead_details(lead: Lead):
     # Publications
     if lead.publications:
         st.subheader("Publications")
-        try:
-            pubs = json.loads(lead.publications)
-            for pub in pubs:
+        if isinstance(lead.publications, list):
+            for pub in lead.publications:
                 st.write(f"- **{pub.get('title', 'N/A')}** ({pub.get('year', 'N/A')})")
                 if 'pubmed_id' in pub:
                     st.write(f"  PubMed ID: {pub['pubmed_id']}")
-        except:
+        else:
             st.write(lead.publications)
     
     # Notes
@@ -335,15 +320,21 @@ def main():
         db = SessionLocal()
         repo = LeadRepository(db)
         
-        leads = repo.search_leads(
-            name=search_name if search_name else None,
-            company=search_company if search_company else None,
-            location=search_location if search_location else None,
-            min_score=score_range[0],
-            max_score=score_range[1]
-        )
+        filters = {
+            'name': search_name if search_name else None,
+            'company': search_company if search_company else None,
+            'location': search_location if search_location else None,
+            'min_score': score_range[0],
+            'max_score': score_range[1],
+        }
+        
+        # search_leads returns only the top-scored leads; count all matches for the header
+        leads = repo.search_leads(**filters)
+        total_found = repo.count_leads(**filters)
         
-        st.subheader(f"Leads ({len(leads)} found)")
+        st.subheader(f"Leads ({total_found} found)")
+        if total_found > len(leads):
+            st.caption(f"Showing the top {len(leads)} leads by score")
         display_leads_table(leads)
         
         db.close()
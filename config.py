@@ -2,7 +2,8 @@
 Configuration management for Lead Generation Web Agent
 """
 import os
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Tuple
 from pydantic_settings import BaseSettings
 
 
@@ -11,9 +12,11 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./leads.db"
+    INSERT_PAGE_SIZE: int = 1000  # Rows per multi-row INSERT in bulk loads
     
     # API Keys (optional for MVP)
     PUBMED_EMAIL: str = "your-email@example.com"  # Required for PubMed API
+    NCBI_API_KEY: str = ""  # Optional: raises the NCBI rate limit from 3 to 10 requests/second
     HUNTER_API_KEY: str = ""  # Optional: Hunter.io for email finding
     CLEARBIT_API_KEY: str = ""  # Optional: Clearbit for company data
     PROXYCURL_API_KEY: str = ""  # Optional: Proxycurl for LinkedIn data
@@ -24,7 +27,7 @@ class Settings(BaseSettings):
 
 
 # Target Job Titles
-TARGET_JOB_TITLES = [
+TARGET_JOB_TITLES: Tuple[str, ...] = (
     "Director of Toxicology",
     "Head of Preclinical Safety",
     "VP of Safety Assessment",
@@ -35,10 +38,10 @@ TARGET_JOB_TITLES = [
     "Toxicologist",
     "Safety Assessment",
     "Hepatic Research",
-]
+)
 
 # PubMed Search Keywords
-PUBMED_KEYWORDS = [
+PUBMED_KEYWORDS: Tuple[str, ...] = (
     "Drug-Induced Liver Injury",
     "DILI",
     "3D cell culture",
@@ -48,7 +51,7 @@ PUBMED_KEYWORDS = [
     "in vitro toxicology",
     "hepatotoxicity",
     "liver organoids",
-]
+)
 
 # Geographic Hubs and Scores
 LOCATION_SCORES: Dict[str, int] = {
@@ -117,7 +120,7 @@ CONFERENCE_URLS = {
 }
 
 # Company Technology Keywords
-TECH_KEYWORDS = [
+TECH_KEYWORDS: Tuple[str, ...] = (
     "3D models",
     "3D cell culture",
     "organoids",
@@ -127,10 +130,10 @@ TECH_KEYWORDS = [
     "alternative methods",
     "in vitro",
     "microphysiological systems",
-]
+)
 
 # Funding Stages
-FUNDING_STAGES = [
+FUNDING_STAGES: Tuple[str, ...] = (
     "Seed",
     "Series A",
     "Series B",
@@ -140,9 +143,10 @@ FUNDING_STAGES = [
     "Public",
     "Bootstrapped",
     "Unknown",
-]
+)
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings"""
+    """Get application settings (parsed once per process)"""
     return Settings()
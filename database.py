@@ -2,19 +2,68 @@
 Database models and operations for Lead Generation Web Agent
 """
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+import pandas as pd
+from sqlalchemy import create_engine, Column, Computed, Integer, JSON, String, Float, DateTime, Text, Index, case, column, delete, event, func, insert, inspect, or_, select, text, tuple_, update
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import deferred, sessionmaker, Session
 from config import get_settings
 
 settings = get_settings()
 
 # Create database engine
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if settings.DATABASE_URL.startswith("sqlite"):
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        insertmanyvalues_page_size=settings.INSERT_PAGE_SIZE,
+    )
+    
+    # Per-connection SQLite settings: write-ahead logging so readers (e.g. exports) don't
+    # block writers, fsync only at WAL checkpoints, and larger in-memory caches
+    SQLITE_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",  # 256 MB
+        "PRAGMA cache_size=-65536",  # 64 MB
+    )
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        """Apply SQLITE_PRAGMAS to each new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_use_lifo=True,
+        pool_pre_ping=True,
+        insertmanyvalues_page_size=settings.INSERT_PAGE_SIZE,
+    )
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+# Bumped on every write statement so caches of query results can be keyed on it
+_table_version = 0
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _bump_table_version(conn, cursor, statement, parameters, context, executemany):
+    """Count INSERT/UPDATE/DELETE statements issued through the engine"""
+    global _table_version
+    if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+        _table_version += 1
+
+
+def get_table_version() -> int:
+    """Get the current write counter for the leads database"""
+    return _table_version
+
 
 class Lead(Base):
     """Lead model representing a potential customer"""
@@ -42,12 +91,13 @@ class Lead(Base):
     is_remote = Column(String)
     
     # Scientific Profile
-    publications = Column(Text)  # JSON string of publications
+    publications = Column(JSON)  # List of publication dicts
+    pub_count = Column(Integer, Computed("json_array_length(publications)"), index=True)
     recent_publication_count = Column(Integer, default=0)
-    conference_participation = Column(Text)  # JSON string
+    conference_participation = Column(Text)  # Comma-separated conference names
     
     # Technology Signals
-    tech_keywords_found = Column(Text)  # JSON string
+    tech_keywords_found = Column(JSON().with_variant(JSONB(), 'postgresql'))  # List of keywords
     
     # Scoring
     role_fit_score = Column(Float, default=0.0)
@@ -64,11 +114,139 @@ class Lead(Base):
     
     # Notes
     notes = Column(Text)
+    
+    # Lowercased copies of the searchable text columns, stored when a row is written,
+    # so substring filters can use a plain LIKE instead of lowercasing every row per query.
+    # Deferred, since they are only filtered on and never need loading with a Lead
+    name_lc = deferred(Column(String, Computed("lower(name)", persisted=True)))
+    title_lc = deferred(Column(String, Computed("lower(title)", persisted=True)))
+    company_lc = deferred(Column(String, Computed("lower(company)", persisted=True)))
+    person_location_lc = deferred(Column(String, Computed("lower(person_location)", persisted=True)))
+    company_hq_lc = deferred(Column(String, Computed("lower(company_hq)", persisted=True)))
+    
+    __table_args__ = (
+        # One row per person per company; scrapes dedupe against this key
+        Index('ix_leads_name_company', 'name', 'company', unique=True),
+        # Keyword membership lookups (JSONB containment); only Postgres can index these
+        Index('ix_leads_tech_gin', tech_keywords_found, postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
+
+# Columns loaded for the dashboard leads table
+LEAD_TABLE_COLUMNS = (
+    Lead.id,
+    Lead.name,
+    Lead.title,
+    Lead.company,
+    Lead.person_location,
+    Lead.company_hq,
+    Lead.email,
+    Lead.linkedin_url,
+    Lead.total_score,
+)
+
+
+# Text columns indexed by the SQLite full-text search table
+FTS_COLUMNS = ('name', 'title', 'company', 'person_location', 'company_hq')
+
+# Full-text search is only available on SQLite; other backends use ILIKE
+USE_FTS = engine.dialect.name == "sqlite"
+
+# The trigram tokenizer matches case-insensitive substrings, like ILIKE '%term%',
+# but only for terms of at least this many characters
+FTS_MIN_TERM_LENGTH = 3
+
+_FTS_COLS = ", ".join(FTS_COLUMNS)
+_FTS_NEW = ", ".join(f"new.{col}" for col in FTS_COLUMNS)
+_FTS_OLD = ", ".join(f"old.{col}" for col in FTS_COLUMNS)
+
+# External-content FTS5 table over leads, kept in sync by triggers
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE leads_fts USING fts5({_FTS_COLS}, "
+    f"content='leads', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER leads_fts_ai AFTER INSERT ON leads BEGIN "
+    f"INSERT INTO leads_fts(rowid, {_FTS_COLS}) VALUES (new.id, {_FTS_NEW}); END",
+    f"CREATE TRIGGER leads_fts_ad AFTER DELETE ON leads BEGIN "
+    f"INSERT INTO leads_fts(leads_fts, rowid, {_FTS_COLS}) VALUES ('delete', old.id, {_FTS_OLD}); END",
+    f"CREATE TRIGGER leads_fts_au AFTER UPDATE ON leads BEGIN "
+    f"INSERT INTO leads_fts(leads_fts, rowid, {_FTS_COLS}) VALUES ('delete', old.id, {_FTS_OLD}); "
+    f"INSERT INTO leads_fts(rowid, {_FTS_COLS}) VALUES (new.id, {_FTS_NEW}); END",
+    # Index any leads stored before the search table existed
+    "INSERT INTO leads_fts(leads_fts) VALUES ('rebuild')",
+)
+
+
+def _upgrade_leads_table(conn):
+    """
+    Bring a leads table created by an older version up to the current Lead model
+    create_all() skips tables that already exist, so missing columns and indexes are added here
+    """
+    if engine.dialect.name != "sqlite":
+        existing = {col['name'] for col in inspect(conn).get_columns(Lead.__tablename__)}
+        missing = [col.name for col in Lead.__table__.columns if col.name not in existing]
+        if missing:
+            raise RuntimeError(
+                f"The leads table is missing columns {', '.join(missing)}; "
+                "add them with a migration before starting the app"
+            )
+        return
+    
+    # Check the stored rows first: pysqlite runs DDL outside the transaction, so a
+    # failure halfway through would leave the table half upgraded
+    for col in Lead.__table__.columns:
+        if isinstance(col.type, JSON):
+            invalid = conn.execute(text(
+                f"SELECT id FROM leads WHERE {col.name} IS NOT NULL AND NOT json_valid({col.name}) LIMIT 1"
+            )).first()
+            if invalid:
+                raise RuntimeError(
+                    f"Lead {invalid[0]} has a {col.name} value that is not valid JSON; "
+                    "fix or remove such rows and restart"
+                )
+    
+    existing_indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(leads)"))}
+    for index in Lead.__table__.indexes:
+        if index.unique and index.name not in existing_indexes:
+            key = ", ".join(col.name for col in index.columns)
+            duplicate = conn.execute(text(
+                f"SELECT 1 FROM leads GROUP BY {key} HAVING COUNT(*) > 1 LIMIT 1"
+            )).first()
+            if duplicate:
+                raise RuntimeError(
+                    f"Could not create unique index {index.name}: the leads table has duplicate "
+                    f"({key}) rows; remove them and restart"
+                )
+    
+    # table_xinfo (unlike table_info) also lists generated columns
+    existing = {row[1] for row in conn.execute(text("PRAGMA table_xinfo(leads)"))}
+    for col in Lead.__table__.columns:
+        if col.name in existing:
+            continue
+        ddl = f"ALTER TABLE leads ADD COLUMN {col.name} {col.type.compile(dialect=engine.dialect)}"
+        if col.computed is not None:
+            # SQLite can only add generated columns as VIRTUAL; stored ones are
+            # computed on read in upgraded databases
+            ddl += f" GENERATED ALWAYS AS ({col.computed.sqltext}) VIRTUAL"
+        conn.execute(text(ddl))
+    
+    for index in Lead.__table__.indexes:
+        index.create(conn, checkfirst=True)
 
 
 def init_db():
-    """Initialize the database"""
+    """Initialize the database, upgrading an existing leads table in place"""
     Base.metadata.create_all(bind=engine)
+    
+    with engine.begin() as conn:
+        _upgrade_leads_table(conn)
+        
+        if USE_FTS:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads_fts'")
+            ).first()
+            if not exists:
+                for statement in FTS_DDL:
+                    conn.execute(text(statement))
 
 
 def get_db() -> Session:
@@ -94,6 +272,41 @@ class LeadRepository:
         self.db.refresh(lead)
         return lead
     
+    def create_leads_bulk(self, lead_data: List[dict]) -> int:
+        """Create many leads with one executemany INSERT and a single commit"""
+        if not lead_data:
+            return 0
+        self.db.bulk_insert_mappings(Lead, lead_data)
+        self.db.commit()
+        return len(lead_data)
+    
+    def insert_new_leads(self, lead_data: List[dict]) -> int:
+        """
+        Insert the leads whose (name, company) is not stored yet (or repeated in lead_data)
+        in one transaction; returns the number added. Rolls back and re-raises on failure
+        """
+        existing = self.get_existing_keys((lead['name'], lead['company']) for lead in lead_data)
+        new_leads = []
+        for lead in lead_data:
+            key = (lead['name'], lead['company'])
+            if key not in existing:
+                existing.add(key)
+                new_leads.append(lead)
+        
+        try:
+            return self.create_leads_bulk(new_leads)
+        except Exception:
+            self.db.rollback()
+            raise
+    
+    def create_leads_returning(self, lead_data: List[dict]) -> List[Lead]:
+        """Create many leads in one batch and return the new Lead rows"""
+        if not lead_data:
+            return []
+        leads = self.db.scalars(insert(Lead).returning(Lead), lead_data).all()
+        self.db.commit()
+        return leads
+    
     def get_lead(self, lead_id: int) -> Optional[Lead]:
         """Get a lead by ID"""
         return self.db.query(Lead).filter(Lead.id == lead_id).first()
@@ -102,7 +315,50 @@ class LeadRepository:
         """Get all leads"""
         return self.db.query(Lead).order_by(Lead.total_score.desc()).all()
     
-    def search_leads(
+    def get_all_leads_summary(self, columns: Sequence = LEAD_TABLE_COLUMNS) -> List[Row]:
+        """Get only the given columns of all leads, best first, without building Lead objects"""
+        stmt = select(*columns).order_by(Lead.total_score.desc())
+        return self.db.execute(stmt).all()
+    
+    def iter_leads_summary(
+        self,
+        columns: Sequence = LEAD_TABLE_COLUMNS,
+        chunk_size: int = 1000,
+    ) -> Iterator[List[Row]]:
+        """Stream the same rows as get_all_leads_summary in chunks of at most chunk_size"""
+        stmt = select(*columns).order_by(Lead.total_score.desc())
+        result = self.db.execute(stmt.execution_options(yield_per=chunk_size))
+        yield from result.partitions()
+    
+    def get_existing_keys(self, keys: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """Get the (name, company) pairs from keys that are already stored"""
+        keys = list(keys)
+        if not keys:
+            return set()
+        rows = self.db.query(Lead.name, Lead.company).filter(
+            tuple_(Lead.name, Lead.company).in_(keys)
+        ).all()
+        return {(name, company) for name, company in rows}
+    
+    def get_lead_stats(self) -> Tuple[int, int, int, int]:
+        """Get (total, hot, warm, cold) lead counts in a single aggregate query"""
+        total, hot, warm, cold = self.db.query(
+            func.count(Lead.id),
+            func.count(case((Lead.total_score >= 80, 1))),
+            func.count(case(((Lead.total_score >= 50) & (Lead.total_score < 80), 1))),
+            func.count(case((Lead.total_score < 50, 1))),
+        ).one()
+        return total, hot, warm, cold
+    
+    def list_lead_names_ids(self, limit: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """Get (id, name, company) tuples without hydrating full Lead rows"""
+        query = self.db.query(Lead).with_entities(Lead.id, Lead.name, Lead.company)
+        query = query.order_by(Lead.total_score.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return [tuple(row) for row in query.all()]
+    
+    def _search_query(
         self,
         name: Optional[str] = None,
         title: Optional[str] = None,
@@ -111,57 +367,117 @@ class LeadRepository:
         max_score: Optional[float] = None,
         location: Optional[str] = None,
         search_term: Optional[str] = None,
-    ) -> List[Lead]:
-        """Search leads with filters"""
+        tech_keyword: Optional[str] = None,
+    ):
+        """Build the filtered, score-ordered lead query shared by the search methods"""
         query = self.db.query(Lead)
         
-        if search_term:
-            term = f"%{search_term}%"
-            query = query.filter(
-                (Lead.name.ilike(term)) |
-                (Lead.title.ilike(term)) |
-                (Lead.company.ilike(term)) |
-                (Lead.person_location.ilike(term)) |
-                (Lead.company_hq.ilike(term))
-            )
+        # (columns, term) text filters; each term must match at least one of its columns
+        text_filters = [
+            (FTS_COLUMNS, search_term),
+            (('name',), name),
+            (('title',), title),
+            (('company',), company),
+            (('person_location', 'company_hq'), location),
+        ]
+        
+        fts_clauses = []
+        for columns, term in text_filters:
+            if not term:
+                continue
+            if USE_FTS and len(term) >= FTS_MIN_TERM_LENGTH:
+                phrase = term.replace('"', '""')
+                fts_clauses.append(f'{{{" ".join(columns)}}} : "{phrase}"')
+            else:
+                pattern = f"%{term.lower()}%"
+                query = query.filter(or_(*(getattr(Lead, f"{col}_lc").like(pattern) for col in columns)))
         
-        if name:
-            query = query.filter(Lead.name.ilike(f"%{name}%"))
-        if title:
-            query = query.filter(Lead.title.ilike(f"%{title}%"))
-        if company:
-            query = query.filter(Lead.company.ilike(f"%{company}%"))
+        # Resolve all full-text filters with a single MATCH against the search table
+        if fts_clauses:
+            matches = text(
+                "SELECT rowid FROM leads_fts WHERE leads_fts MATCH :fts_query"
+            ).bindparams(fts_query=" AND ".join(fts_clauses)).columns(column("rowid"))
+            query = query.filter(Lead.id.in_(matches))
+        
+        if tech_keyword:
+            query = query.filter(self._has_tech_keyword(tech_keyword))
         if min_score is not None:
             query = query.filter(Lead.total_score >= min_score)
         if max_score is not None:
             query = query.filter(Lead.total_score <= max_score)
-        if location:
-            query = query.filter(
-                (Lead.person_location.ilike(f"%{location}%")) |
-                (Lead.company_hq.ilike(f"%{location}%"))
-            )
+        return query.order_by(Lead.total_score.desc())
+    
+    @staticmethod
+    def _has_tech_keyword(keyword: str):
+        """Filter for leads whose tech_keywords_found list contains keyword, evaluated in the database"""
+        if engine.dialect.name == "postgresql":
+            # JSONB containment, served by ix_leads_tech_gin
+            return Lead.tech_keywords_found.contains([keyword])
         
-        return query.order_by(Lead.total_score.desc()).all()
+        # SQLite JSON1: look the keyword up among the array's elements
+        keywords = func.json_each(Lead.tech_keywords_found).table_valued('value')
+        return select(keywords.c.value).where(keywords.c.value == keyword).exists()
+    
+    def search_leads(
+        self,
+        name: Optional[str] = None,
+        title: Optional[str] = None,
+        company: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        location: Optional[str] = None,
+        search_term: Optional[str] = None,
+        tech_keyword: Optional[str] = None,
+        limit: Optional[int] = 500,
+    ) -> List[Lead]:
+        """Search leads with filters, returning at most limit top-scored leads"""
+        query = self._search_query(
+            name=name,
+            title=title,
+            company=company,
+            min_score=min_score,
+            max_score=max_score,
+            location=location,
+            search_term=search_term,
+            tech_keyword=tech_keyword,
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+    
+    def search_leads_df(self, limit: Optional[int] = 500, **filters) -> pd.DataFrame:
+        """
+        Search leads with the same filters as search_leads
+        Returns the table columns as a DataFrame without building ORM objects
+        """
+        query = self._search_query(**filters).with_entities(*LEAD_TABLE_COLUMNS)
+        if limit is not None:
+            query = query.limit(limit)
+        return pd.read_sql_query(query.statement, self.db.connection())
+    
+    def count_leads(self, **filters) -> int:
+        """Count leads matching the same filters as search_leads"""
+        return self._search_query(**filters).order_by(None).count()
     
     def update_lead(self, lead_id: int, lead_data: dict) -> Optional[Lead]:
-        """Update a lead"""
-        lead = self.get_lead(lead_id)
-        if lead:
-            for key, value in lead_data.items():
-                setattr(lead, key, value)
-            lead.updated_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(lead)
+        """Update a lead with a single UPDATE ... RETURNING statement"""
+        stmt = (
+            update(Lead)
+            .where(Lead.id == lead_id)
+            .values(**lead_data, updated_at=datetime.utcnow())
+            .returning(Lead)
+        )
+        lead = self.db.scalars(stmt).one_or_none()
+        self.db.commit()
         return lead
     
     def delete_lead(self, lead_id: int) -> bool:
-        """Delete a lead"""
-        lead = self.get_lead(lead_id)
-        if lead:
-            self.db.delete(lead)
-            self.db.commit()
-            return True
-        return False
+        """Delete a lead with a single DELETE ... RETURNING statement"""
+        deleted_id = self.db.scalars(
+            delete(Lead).where(Lead.id == lead_id).returning(Lead.id)
+        ).one_or_none()
+        self.db.commit()
+        return deleted_id is not None
     
     def get_leads_by_score_range(self, min_score: float, max_score: float) -> List[Lead]:
         """Get leads within a score range"""
@@ -2,20 +2,82 @@
 Email finder and generator for lead enrichment
 """
 import re
-from typing import Optional, List
+from functools import lru_cache
+from typing import Iterable, Optional, List, Tuple
+from urllib.parse import quote as _urlquote
+
+# Honorifics dropped from the front of a name (lowercase, without the trailing dot)
+_TITLES = frozenset({'dr', 'prof', 'mr', 'ms', 'mrs'})
+
+# Precompiled patterns used on every enrichment call
+_SUFFIX_RE = re.compile(r'\s+(inc|corp|corporation|ltd|limited|llc|gmbh)\.?$', re.IGNORECASE)
+_NONALNUM_RE = re.compile(r'[^a-z0-9\s]')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# (conferences, keywords) in priority order; a rule applies if any keyword appears
+_CONFERENCE_RULES = (
+    # Toxicology conferences
+    (('SOT (Society of Toxicology)',), ('toxicology', 'toxicologist', 'safety', 'dili', 'liver')),
+    # Cancer research conferences
+    (('AACR (American Association for Cancer Research)',), ('cancer', 'oncology', 'tumor', 'carcinoma')),
+    # Drug metabolism conferences
+    (('ISSX (International Society for the Study of Xenobiotics)',), ('metabolism', 'pharmacokinetics', 'xenobiotic')),
+    # 3D cell culture / organoid conferences
+    (('Organ-on-Chip World Summit', '3D Cell Culture Conference'), ('3d', 'organoid', 'spheroid', 'organ-on-chip', 'in vitro')),
+    # Liver disease conferences
+    (('AASLD (American Association for the Study of Liver Diseases)',), ('hepat', 'liver', 'cirrhosis')),
+)
+
+# Keyword -> indexes of the rules it triggers
+_CONFERENCE_KEYWORD_RULES = {}
+for _rule, (_, _keywords) in enumerate(_CONFERENCE_RULES):
+    for _keyword in _keywords:
+        _CONFERENCE_KEYWORD_RULES.setdefault(_keyword, set()).add(_rule)
+
+# Lookahead alternation so overlapping keywords are all found in one pass
+_CONFERENCE_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_CONFERENCE_KEYWORD_RULES, key=len, reverse=True))) + '))'
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_name_cached(name: str) -> Optional[Tuple[str, str]]:
+    """Parse full name into a (first, last) tuple; cached since names repeat across papers"""
+    parts = name.split()
+    
+    # Remove titles
+    while parts and parts[0].rstrip('.').lower() in _TITLES:
+        parts = parts[1:]
+    
+    if len(parts) < 2:
+        return None
+    
+    # Take first and last, ignore middle names/initials
+    return parts[0], parts[-1]
+
+
+@lru_cache(maxsize=4096)
+def _generate_domain_cached(company: str) -> str:
+    """Generate domain from company name; cached since affiliations repeat across leads"""
+    # Clean company name
+    company = company.lower()
+    
+    # Remove common suffixes
+    company = _SUFFIX_RE.sub('', company)
+    
+    # Remove special characters
+    company = _NONALNUM_RE.sub('', company)
+    
+    # Take the first word (also for multi-word companies)
+    words = company.split()
+    domain = words[0] if words else "example"
+    
+    return f"{domain}.com"
 
 
 class EmailFinder:
     """Generate and validate email addresses"""
     
-    def __init__(self):
-        self.common_patterns = [
-            "{first}.{last}@{domain}",
-            "{first}{last}@{domain}",
-            "{first_initial}{last}@{domain}",
-            "{first}_{last}@{domain}",
-        ]
-    
     def generate_email(self, name: str, company: str, domain: Optional[str] = None) -> str:
         """
         Generate most likely email address based on name and company
@@ -30,7 +92,6 @@ class EmailFinder:
         
         first = parts['first'].lower()
         last = parts['last'].lower()
-        first_initial = first[0] if first else ""
         
         # Get or generate domain
         if not domain:
@@ -54,71 +115,44 @@ class EmailFinder:
         
         first = parts['first'].lower()
         last = parts['last'].lower()
-        first_initial = first[0] if first else ""
         
         if not domain:
             domain = self._generate_domain(company)
         
-        emails = []
-        for pattern in self.common_patterns:
-            email = pattern.format(
-                first=first,
-                last=last,
-                first_initial=first_initial,
-                domain=domain
-            )
-            emails.append(email)
-        
-        return emails
+        # Common patterns, most likely first (parsed names are never empty)
+        return [
+            f"{first}.{last}@{domain}",
+            f"{first}{last}@{domain}",
+            f"{first[0]}{last}@{domain}",
+            f"{first}_{last}@{domain}",
+        ]
     
     def _parse_name(self, name: str) -> Optional[dict]:
         """Parse full name into first and last name"""
-        # Remove titles
-        name = re.sub(r'\b(Dr|Prof|Mr|Ms|Mrs)\.?\s+', '', name, flags=re.IGNORECASE)
-        
-        parts = name.strip().split()
-        
-        if len(parts) < 2:
+        parts = _parse_name_cached(name)
+        if not parts:
             return None
-        
-        # Handle middle names/initials
-        if len(parts) == 2:
-            return {'first': parts[0], 'last': parts[1]}
-        else:
-            # Take first and last, ignore middle
-            return {'first': parts[0], 'last': parts[-1]}
+        return {'first': parts[0], 'last': parts[1]}
     
     def _generate_domain(self, company: str) -> str:
         """
         Generate domain from company name
         This is a simple heuristic - in production, use a company domain lookup service
         """
-        # Clean company name
-        company = company.lower()
-        
-        # Remove common suffixes
-        company = re.sub(r'\s+(inc|corp|corporation|ltd|limited|llc|gmbh)\.?$', '', company, flags=re.IGNORECASE)
-        
-        # Remove special characters
-        company = re.sub(r'[^a-z0-9\s]', '', company)
-        
-        # Take first word or combine first two words
-        words = company.split()
-        if words:
-            if len(words) == 1:
-                domain = words[0]
-            else:
-                # For multi-word companies, try to create a reasonable domain
-                domain = words[0]
-        else:
-            domain = "example"
-        
-        return f"{domain}.com"
+        return _generate_domain_cached(company)
     
     def validate_email_format(self, email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(_EMAIL_RE.match(email))
+    
+    def validate_emails_batch(self, emails: Iterable[str]) -> List[bool]:
+        """
+        Validate the format of many emails at once
+        Each distinct address is matched only once, since generated emails repeat across leads
+        """
+        emails = list(emails)
+        valid = {email: bool(_EMAIL_RE.match(email)) for email in set(emails)}
+        return [valid[email] for email in emails]
     
     def generate_linkedin_url(self, name: str, company: str = None) -> str:
         """
@@ -133,8 +167,7 @@ class EmailFinder:
             query += f" {company}"
             
         # Encode for URL
-        import urllib.parse
-        encoded_query = urllib.parse.quote(query)
+        encoded_query = _urlquote(query)
         
         return f"https://www.google.com/search?q={encoded_query}"
     
@@ -143,41 +176,23 @@ class EmailFinder:
         Suggest relevant conferences based on job title and publications
         Returns comma-separated list of likely conferences
         """
-        conferences = []
-        
-        # Convert title to lowercase for matching
-        title_lower = title.lower() if title else ""
-        
-        # Check publications for keywords
-        pub_text = ""
+        # Combine title and publication titles, lowercased once, for keyword matching
+        texts = [title or ""]
         if publications:
-            for pub in publications:
-                if isinstance(pub, dict):
-                    pub_text += pub.get('title', '').lower() + " "
-        
-        # Combine title and publication text for keyword matching
-        combined_text = title_lower + " " + pub_text
-        
-        # Toxicology conferences
-        if any(keyword in combined_text for keyword in ['toxicology', 'toxicologist', 'safety', 'dili', 'liver']):
-            conferences.append('SOT (Society of Toxicology)')
-        
-        # Cancer research conferences
-        if any(keyword in combined_text for keyword in ['cancer', 'oncology', 'tumor', 'carcinoma']):
-            conferences.append('AACR (American Association for Cancer Research)')
-        
-        # Drug metabolism conferences
-        if any(keyword in combined_text for keyword in ['metabolism', 'pharmacokinetics', 'xenobiotic']):
-            conferences.append('ISSX (International Society for the Study of Xenobiotics)')
-        
-        # 3D cell culture / organoid conferences
-        if any(keyword in combined_text for keyword in ['3d', 'organoid', 'spheroid', 'organ-on-chip', 'in vitro']):
-            conferences.append('Organ-on-Chip World Summit')
-            conferences.append('3D Cell Culture Conference')
-        
-        # Liver disease conferences
-        if any(keyword in combined_text for keyword in ['hepat', 'liver', 'cirrhosis']):
-            conferences.append('AASLD (American Association for the Study of Liver Diseases)')
+            texts.extend(pub.get('title', '') for pub in publications if isinstance(pub, dict))
+        combined_text = " ".join(texts).lower()
+        
+        # One scan finds every keyword occurrence, then the matching rules are kept in order
+        matched_rules = {
+            rule for match in _CONFERENCE_RE.finditer(combined_text)
+            for rule in _CONFERENCE_KEYWORD_RULES[match.group(1)]
+        }
+        conferences = [
+            conference
+            for rule, (rule_conferences, _) in enumerate(_CONFERENCE_RULES)
+            if rule in matched_rules
+            for conference in rule_conferences
+        ]
         
         # Default if no specific match
         if not conferences:
@@ -2,84 +2,83 @@
 Export leads from database to Excel format for demo submission
 """
 import pandas as pd
-from sqlalchemy import create_engine
-from database import Lead
+from database import Lead, LeadRepository, SessionLocal
 import json
 
-def export_leads_to_excel(output_file='lead_generation_output.xlsx'):
-    """Export all leads to Excel with proper formatting"""
-    
-    # Connect to database
-    engine = create_engine('sqlite:///leads.db')
-    
-    # Query all leads
-    query = """
-    SELECT 
-        name,
-        title,
-        company,
-        person_location,
-        email,
-        role_fit_score,
-        company_intent_score,
-        technographic_score,
-        location_score,
-        scientific_intent_score,
-        total_score,
-        recent_publication_count,
-        data_source,
-        created_at
-    FROM leads
-    ORDER BY total_score DESC
+# Rows read from the database and written to the sheet at a time
+EXPORT_CHUNK_SIZE = 10_000
+
+# Score columns rounded to 1 decimal place
+SCORE_COLUMNS = [
+    'role_fit_score', 'company_intent_score', 'technographic_score',
+    'location_score', 'scientific_intent_score', 'total_score'
+]
+
+# Column names for better readability
+COLUMN_NAMES = {
+    'name': 'Name',
+    'title': 'Job Title',
+    'company': 'Company',
+    'person_location': 'Location',
+    'email': 'Email',
+    'role_fit_score': 'Role Fit Score (0-30)',
+    'company_intent_score': 'Company Intent Score (0-20)',
+    'technographic_score': 'Technographic Score (0-25)',
+    'location_score': 'Location Score (0-10)',
+    'scientific_intent_score': 'Scientific Intent Score (0-40)',
+    'total_score': 'Total Score (0-100)',
+    'score_category': 'Category',
+    'recent_publication_count': 'Publications',
+    'data_source': 'Data Source',
+    'created_at': 'Date Added'
+}
+
+# Lead columns read from the database (the category is derived from total_score)
+EXPORT_COLUMNS = [getattr(Lead, col) for col in COLUMN_NAMES if col != 'score_category']
+
+
+def prepare_export_chunk(df: pd.DataFrame) -> pd.DataFrame:
     """
-    
-    df = pd.read_sql(query, engine)
-    
-    # Calculate score category
-    def get_category(score):
-        if score >= 80:
-            return 'Hot Lead'
-        elif score >= 50:
-            return 'Warm Lead'
-        else:
-            return 'Cold Lead'
-    
-    df['score_category'] = df['total_score'].apply(get_category)
+    Add the score category, round scores and rename columns for one chunk of leads
+    The category stays categorical (three codes) rather than one string per row
+    """
+    # Calculate score category (Cold < 50 <= Warm < 80 <= Hot)
+    df['score_category'] = pd.cut(
+        df['total_score'].fillna(0),
+        bins=[-float('inf'), 50, 80, float('inf')],
+        labels=['Cold Lead', 'Warm Lead', 'Hot Lead'],
+        right=False
+    )
     
     # Round scores to 1 decimal place
-    score_columns = [
-        'role_fit_score', 'company_intent_score', 'technographic_score',
-        'location_score', 'scientific_intent_score', 'total_score'
-    ]
-    for col in score_columns:
-        df[col] = df[col].round(1)
+    df[SCORE_COLUMNS] = df[SCORE_COLUMNS].round(1)
     
-    # Rename columns for better readability
-    df = df.rename(columns={
-        'name': 'Name',
-        'title': 'Job Title',
-        'company': 'Company',
-        'person_location': 'Location',
-        'email': 'Email',
-        'role_fit_score': 'Role Fit Score (0-30)',
-        'company_intent_score': 'Company Intent Score (0-20)',
-        'technographic_score': 'Technographic Score (0-25)',
-        'location_score': 'Location Score (0-10)',
-        'scientific_intent_score': 'Scientific Intent Score (0-40)',
-        'total_score': 'Total Score (0-100)',
-        'score_category': 'Category',
-        'recent_publication_count': 'Publications',
-        'data_source': 'Data Source',
-        'created_at': 'Date Added'
-    })
+    # Order columns as in the sheet layout and rename them
+    return df[list(COLUMN_NAMES)].rename(columns=COLUMN_NAMES)
+
+
+def export_leads_to_excel(output_file='lead_generation_output.xlsx'):
+    """Export all leads to Excel with proper formatting"""
     
-    # Create Excel writer with formatting
-    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name='Leads', index=False)
-        
+    category_counts = {'Hot Lead': 0, 'Warm Lead': 0, 'Cold Lead': 0}
+    row_count = 0
+    
+    # Create Excel writer with formatting; constant_memory flushes each row once written,
+    # so rows must be written strictly top to bottom. Scraped text is always written as
+    # plain strings, skipping the per-cell URL/formula checks (and formula injection)
+    with SessionLocal() as db, pd.ExcelWriter(
+        output_file,
+        engine='xlsxwriter',
+        engine_kwargs={'options': {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'strings_to_urls': False,
+            'strings_to_formulas': False,
+        }}
+    ) as writer:
         # Get workbook and worksheet
         workbook = writer.book
-        worksheet = writer.sheets['Leads']
+        worksheet = workbook.add_worksheet('Leads')
         
         # Define formats
         header_format = workbook.add_format({
@@ -89,13 +88,11 @@ def export_leads_to_excel(output_file='lead_generation_output.xlsx'):
             'border': 1
         })
         
-        hot_format = workbook.add_format({'bg_color': '#C6EFCE'})  # Green
-        warm_format = workbook.add_format({'bg_color': '#FFEB9C'})  # Yellow
-        cold_format = workbook.add_format({'bg_color': '#FFC7CE'})  # Red
-        
-        # Format header row
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
+        category_formats = {
+            'Hot Lead': workbook.add_format({'bg_color': '#C6EFCE'}),  # Green
+            'Warm Lead': workbook.add_format({'bg_color': '#FFEB9C'}),  # Yellow
+            'Cold Lead': workbook.add_format({'bg_color': '#FFC7CE'}),  # Red
+        }
         
         # Set column widths
         worksheet.set_column('A:A', 25)  # Name
@@ -109,25 +106,46 @@ def export_leads_to_excel(output_file='lead_generation_output.xlsx'):
         worksheet.set_column('N:N', 15)  # Data Source
         worksheet.set_column('O:O', 20)  # Date Added
         
-        # Apply conditional formatting to Category column
-        category_col = df.columns.get_loc('Category')
-        for row_num in range(1, len(df) + 1):
-            category = df.iloc[row_num - 1]['Category']
-            if category == 'Hot Lead':
-                worksheet.write(row_num, category_col, category, hot_format)
-            elif category == 'Warm Lead':
-                worksheet.write(row_num, category_col, category, warm_format)
-            else:
-                worksheet.write(row_num, category_col, category, cold_format)
+        # Format header row
+        worksheet.write_row(0, 0, list(COLUMN_NAMES.values()), header_format)
+        category_col = list(COLUMN_NAMES).index('score_category')
         
         # Freeze header row
         worksheet.freeze_panes(1, 0)
+        
+        # Stream leads from the database one chunk at a time, reading only the exported columns
+        repo = LeadRepository(db)
+        for rows in repo.iter_leads_summary(EXPORT_COLUMNS, chunk_size=EXPORT_CHUNK_SIZE):
+            chunk = pd.DataFrame.from_records(
+                rows, columns=[col.key for col in EXPORT_COLUMNS], coerce_float=True
+            )
+            df = prepare_export_chunk(chunk)
+            
+            # Count leads per category from the category codes
+            for category, count in df['Category'].value_counts(sort=False).items():
+                category_counts[category] += int(count)
+            
+            # Write rows, with blank cells for missing values (xlsxwriter cannot write NaN/NaT)
+            cells = df.astype(object).where(df.notna(), None)
+            for values in cells.itertuples(index=False, name=None):
+                row_count += 1
+                worksheet.write_row(row_count, 0, values)
+        
+        # Color the Category column by value, evaluated by Excel itself
+        if row_count:
+            for category, category_format in category_formats.items():
+                worksheet.conditional_format(1, category_col, row_count, category_col, {
+                    'type': 'text',
+                    'criteria': 'containing',
+                    'value': category,
+                    'format': category_format
+                })
     
-    print(f"✅ Exported {len(df)} leads to {output_file}")
+    print(f"✅ Exported {row_count} leads to {output_file}")
     print(f"\nBreakdown:")
-    print(f"  - Hot Leads (80-100): {len(df[df['Category'] == 'Hot Lead'])}")
-    print(f"  - Warm Leads (50-79): {len(df[df['Category'] == 'Warm Lead'])}")
-    print(f"  - Cold Leads (0-49): {len(df[df['Category'] == 'Cold Lead'])}")
+    print(f"  - Hot Leads (80-100): {category_counts['Hot Lead']}")
+    print(f"  - Warm Leads (50-79): {category_counts['Warm Lead']}")
+    print(f"  - Cold Leads (0-49): {category_counts['Cold Lead']}")
     
     return output_file
 
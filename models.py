@@ -0,0 +1,32 @@
+"""
+Lightweight records passed between pipeline stages before leads reach the database
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(slots=True, frozen=True)
+class Author:
+    """An author of a paper, as listed in PubMed"""
+    name: str
+    affiliation: str = ''
+    is_corresponding: bool = False  # Could be enhanced
+
+
+@dataclass(slots=True, frozen=True)
+class Paper:
+    """A PubMed paper with its author list"""
+    title: str
+    year: str
+    month: str
+    authors: Tuple[Author, ...]
+    abstract: str
+    pubmed_id: str
+    
+    def publication(self) -> dict:
+        """The paper as stored in a lead's publications list"""
+        return {
+            'title': self.title,
+            'year': self.year,
+            'pubmed_id': self.pubmed_id
+        }
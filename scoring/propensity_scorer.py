@@ -1,11 +1,335 @@
 """
 Propensity scoring algorithm for lead ranking
 """
-from typing import Dict, List
+from datetime import datetime
+from functools import lru_cache
+from itertools import product
+from typing import Dict, Iterable, List, Pattern, Sequence, Tuple
 import json
+import re
+import numpy as np
+import pandas as pd
 from config import SCORING_WEIGHTS, TOTAL_POSSIBLE_SCORE, LOCATION_SCORES
 
 
+# Year used to judge publication and funding recency
+_CURRENT_YEAR = datetime.now().year
+
+# Leading four-digit year of a date string such as "2025" or "2025-06"
+_YEAR_RE = re.compile(r'^(\d{4})')
+
+# Component score keys, in the column order used for batch scoring
+COMPONENT_KEYS = (
+    'role_fit_score',
+    'company_intent_score',
+    'technographic_score',
+    'location_score',
+    'scientific_intent_score',
+)
+
+
+def _substring_re(keywords: Iterable[str]) -> Pattern:
+    """Compile lowercase substrings into a lookahead alternation that finds every (overlapping) hit in one pass"""
+    return re.compile('(?=(' + '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True))) + '))')
+
+
+# Title substring -> role_fit keyword whose weight it scores
+_ROLE_TOPIC_TERMS = {
+    'toxicology': 'toxicology',
+    'toxicologist': 'toxicology',
+    'safety': 'safety',
+    'hepatic': 'hepatic',
+    'liver': 'liver',
+    '3d': '3d',
+    'in vitro': 'in vitro',
+    'in-vitro': 'in vitro',
+}
+
+# Title substring -> seniority rank, most senior first (director level, principal, scientist)
+_ROLE_SENIORITY_TERMS = {
+    'director': 0,
+    'head': 0,
+    'vp': 0,
+    'vice president': 0,
+    'chief': 0,
+    'principal': 1,
+    'scientist': 2,
+}
+
+_ROLE_RE = _substring_re(list(_ROLE_TOPIC_TERMS) + list(_ROLE_SENIORITY_TERMS))
+
+# Role fit weights resolved once: points per topic term, and the bonus per seniority rank
+_ROLE_TOPIC_POINTS = {
+    term: float(SCORING_WEIGHTS['role_fit']['keywords'][keyword]) for term, keyword in _ROLE_TOPIC_TERMS.items()
+}
+_ROLE_SENIORITY_POINTS = (
+    float(SCORING_WEIGHTS['role_fit']['keywords']['director']),
+    SCORING_WEIGHTS['role_fit']['keywords']['director'] * 0.8,  # Slightly less than director
+    float(SCORING_WEIGHTS['role_fit']['keywords']['scientist']),
+)
+
+# Tech keyword substring -> technographic weight it scores
+_TECH_SIGNAL_TERMS = {
+    '3d model': '3d_models_mention',
+    '3d cell': '3d_models_mention',
+    'nam': 'nams_mention',
+    'alternative method': 'nams_mention',
+    'liver': 'liver_disease_focus',
+    'hepat': 'liver_disease_focus',
+}
+
+_TECH_SIGNAL_RE = _substring_re(_TECH_SIGNAL_TERMS)
+
+# Company names suggesting a relevant focus ('organ' also covers 'organoid')
+_COMPANY_FOCUS_RE = re.compile('liver|hepat|organ|biotech')
+
+# Location substring -> (precedence, score): hubs in LOCATION_SCORES order, then aliases
+_LOCATION_TERMS = {}
+for _hub, _score in LOCATION_SCORES.items():
+    _LOCATION_TERMS.setdefault(_hub.lower(), (len(_LOCATION_TERMS), _score))
+for _alias, _hub in (
+    ('san francisco', 'Bay Area'),
+    ('sf', 'Bay Area'),
+    ('palo alto', 'Bay Area'),
+    ('ma', 'Boston'),  # Could be Boston area
+    ('massachusetts', 'Boston'),
+):
+    _LOCATION_TERMS.setdefault(_alias, (len(_LOCATION_TERMS), LOCATION_SCORES[_hub]))
+
+_LOCATION_RE = _substring_re(_LOCATION_TERMS)
+
+# Notes mentioning NIH or other grants
+_GRANT_RE = re.compile('nih|grant')
+
+# Publication titles about 3D culture
+_CULTURE_3D_RE = re.compile('3d|spheroid|organoid|organ-on-chip')
+
+
+def _lower_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Lowercased text column, with '' for missing values or a missing column"""
+    if column not in df:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].fillna('').astype(str).str.lower()
+
+
+def _object_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Raw column values, with '' for missing values or a missing column"""
+    if column not in df:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].astype(object).where(df[column].notna(), '')
+
+
+def _parse_json_list(value) -> Sequence:
+    """Parse a list stored as a JSON string (or already a list); anything else is empty"""
+    if isinstance(value, str):
+        return _parse_json_list_string(value)
+    return value if isinstance(value, list) else ()
+
+
+@lru_cache(maxsize=4096)
+def _parse_json_list_string(value: str) -> tuple:
+    """Parse a JSON-encoded list into a tuple; cached since the same strings are scored repeatedly"""
+    # Only a JSON array can parse to a list; anything else is rejected without raising
+    if not value.lstrip().startswith('['):
+        return ()
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        return ()
+    return tuple(parsed) if isinstance(parsed, list) else ()
+
+
+def _scientific_intent_points(has_recent: bool, has_older: bool, has_3d_culture_paper: bool, has_conference: bool) -> float:
+    """Scientific intent score for one combination of publication and conference signals"""
+    weights = SCORING_WEIGHTS['scientific_intent']
+    score = 0.0
+    
+    # Add points for publications
+    if has_recent:
+        score += weights['publication_recent']
+    elif has_older:
+        score += weights['publication_older']
+    
+    # Bonus for 3D culture papers
+    if has_3d_culture_paper:
+        score += weights['3d_culture_paper']
+    
+    # Check for conference participation
+    if has_conference:
+        score += weights['conference_presenter']
+    
+    return float(min(score, weights['max_points']))
+
+
+# Scientific intent depends only on four flags, so every combination is scored once up front
+_SCIENTIFIC_INTENT_SCORES = {
+    signals: _scientific_intent_points(*signals) for signals in product((False, True), repeat=4)
+}
+
+
+def _publication_signals(publications: Sequence) -> Tuple[bool, bool, bool]:
+    """
+    Reduce publications to (has_recent, has_older, has_3d_culture_paper)
+    Stops early once a recent 3D culture signal is found, since nothing more can change the score
+    """
+    has_recent = False
+    has_older = False
+    has_3d_culture_paper = False
+    
+    current_year = _CURRENT_YEAR
+    
+    for pub in publications:
+        # Convert year to int only when it is one, treating empty strings and invalid values as 0
+        year_value = pub.get('year', 0)
+        if isinstance(year_value, int):
+            year = year_value
+        elif isinstance(year_value, str) and year_value.strip().isdecimal():
+            year = int(year_value)
+        else:
+            year = 0
+        
+        # Check for 3D culture papers
+        if not has_3d_culture_paper and _CULTURE_3D_RE.search(pub.get('title', '').lower()):
+            has_3d_culture_paper = True
+        
+        # Check recency (only if we have a valid year)
+        if year > 0:
+            if year >= current_year - 1:  # Last 12 months
+                has_recent = True
+            elif year >= current_year - 2:  # 12-24 months
+                has_older = True
+        
+        if has_recent and has_3d_culture_paper:
+            break
+    
+    return has_recent, has_older, has_3d_culture_paper
+
+
+# Funding stage (lowercased) -> (kind, points); 'early' rounds get full points only if recent
+_FUNDING_STAGE_SCORES = {
+    stage: (kind, float(SCORING_WEIGHTS['company_intent'][weight]))
+    for kind, weight, stages in (
+        ('early', 'series_a_b_recent', ('series a', 'series b')),
+        ('late', 'series_c_plus', ('series c', 'series d', 'series d+', 'ipo', 'public')),
+        ('bootstrapped', 'bootstrapped', ('bootstrapped',)),
+    )
+    for stage in stages
+}
+
+# The same table as arrays indexed by categorical code; the trailing entry is the
+# code -1 that pd.Categorical gives stages not in the table
+_FUNDING_STAGES = list(_FUNDING_STAGE_SCORES)
+_FUNDING_STAGE_POINTS = np.array([points for _, points in _FUNDING_STAGE_SCORES.values()] + [0.0])
+_FUNDING_STAGE_EARLY = np.array([kind == 'early' for kind, _ in _FUNDING_STAGE_SCORES.values()] + [False])
+
+
+def _normalize_lead(lead_data: Dict) -> Dict:
+    """Extract the scored text fields of a lead, lowercased once, plus its parsed tech keywords"""
+    notes = lead_data.get('notes', '').lower()
+    return {
+        'title': (lead_data.get('title', '') or '').lower(),
+        'company': lead_data.get('company', '').lower(),
+        'person_location': (lead_data.get('person_location', '') or '').lower(),
+        'funding_stage': lead_data.get('funding_stage', '').lower(),
+        'funding_date': lead_data.get('funding_date', ''),
+        # Check for NIH grants (would be in notes or separate field)
+        'has_grant': bool(_GRANT_RE.search(notes)),
+        'tech_keywords': tuple(_parse_json_list(lead_data.get('tech_keywords_found', ''))),
+    }
+
+
+# Component scores that depend only on a few scalar fields are cached at module level,
+# since titles, locations, funding stages and companies repeat across many leads.
+# Text inputs are lowercased by the caller, so case variants share cache entries
+
+@lru_cache(maxsize=8192)
+def _role_fit_score(title: str) -> float:
+    """Role fit score for a non-empty, lowercased job title"""
+    score = 0.0
+    
+    # One pass over the title collects topic keywords and seniority terms
+    keyword_scores = []
+    seniority = None
+    for match in _ROLE_RE.finditer(title):
+        term = match.group(1)
+        if term in _ROLE_TOPIC_POINTS:
+            keyword_scores.append(_ROLE_TOPIC_POINTS[term])
+        elif seniority is None or _ROLE_SENIORITY_TERMS[term] < seniority:
+            seniority = _ROLE_SENIORITY_TERMS[term]
+    
+    # Add base score for topic match (take max, not sum, to avoid double counting)
+    if keyword_scores:
+        score += max(keyword_scores)
+    
+    # Add seniority bonus for the most senior term found
+    if seniority is not None:
+        score += _ROLE_SENIORITY_POINTS[seniority]
+    
+    return min(score, SCORING_WEIGHTS['role_fit']['max_points'])
+
+
+@lru_cache(maxsize=1024)
+def _company_intent_score(funding_stage: str, funding_date: str, has_grant: bool) -> float:
+    """Company intent score for a lowercased funding stage, funding date and grant flag"""
+    weights = SCORING_WEIGHTS['company_intent']
+    
+    # Look up the funding stage; early rounds score half unless recent (within 12 months)
+    kind, score = _FUNDING_STAGE_SCORES.get(funding_stage, (None, 0.0))
+    if kind == 'early' and not _is_recent_funding(funding_date, months=12):
+        score *= 0.5
+    
+    if has_grant:
+        score += weights['nih_grant']
+    
+    return min(score, weights['max_points'])
+
+
+@lru_cache(maxsize=8192)
+def _technographic_score(tech_keywords: Tuple[str, ...], company: str) -> float:
+    """Technographic score for the tech keywords found and the lowercased company name"""
+    score = 0.0
+    
+    # Check for specific technology mentions in one pass over all keywords
+    # (newline-separated, so no match spans two keywords)
+    signals = {
+        _TECH_SIGNAL_TERMS[match.group(1)]
+        for match in _TECH_SIGNAL_RE.finditer('\n'.join(tech_keywords).lower())
+    }
+    for signal in ('3d_models_mention', 'nams_mention', 'liver_disease_focus'):
+        if signal in signals:
+            score += SCORING_WEIGHTS['technographic'][signal]
+    
+    # Check company name for indicators
+    if _COMPANY_FOCUS_RE.search(company):
+        score += 5  # Bonus for relevant company focus
+    
+    return min(score, SCORING_WEIGHTS['technographic']['max_points'])
+
+
+@lru_cache(maxsize=8192)
+def _location_score(location: str) -> float:
+    """Location hub score for a non-empty, lowercased location"""
+    # One pass over the location finds every hub or alias; the first in precedence wins
+    hits = [_LOCATION_TERMS[match.group(1)] for match in _LOCATION_RE.finditer(location)]
+    if hits:
+        return min(hits)[1]
+    
+    return LOCATION_SCORES['Other']
+
+
+@lru_cache(maxsize=1024)
+def _is_recent_funding(funding_date: str, months: int = 12) -> bool:
+    """Check if funding date is within specified months"""
+    if not funding_date:
+        return False
+    
+    # Simple check - would need proper date parsing in production
+    # Assuming format like "2025" or "2025-06"; non-string dates (e.g. 2025) are read
+    # as their text, the same as score_dataframe does
+    match = _YEAR_RE.match(str(funding_date))
+    return bool(match) and _CURRENT_YEAR - int(match.group(1)) <= months // 12
+
+
 class PropensityScorer:
     """Calculate propensity scores for leads"""
     
@@ -18,13 +342,7 @@ class PropensityScorer:
         Calculate all component scores and total score
         Returns dict with individual scores and total
         """
-        scores = {
-            'role_fit_score': self.calculate_role_fit_score(lead_data.get('title', '')),
-            'company_intent_score': self.calculate_company_intent_score(lead_data),
-            'technographic_score': self.calculate_technographic_score(lead_data),
-            'location_score': self.calculate_location_score(lead_data.get('person_location', '')),
-            'scientific_intent_score': self.calculate_scientific_intent_score(lead_data),
-        }
+        scores = dict(zip(COMPONENT_KEYS, self._component_scores(lead_data)))
         
         # Calculate raw total
         raw_total = sum(scores.values())
@@ -34,114 +352,125 @@ class PropensityScorer:
         
         return scores
     
-    def calculate_role_fit_score(self, title: str) -> float:
+    def calculate_total_scores(self, leads: List[Dict]) -> List[Dict[str, float]]:
         """
-        Calculate role fit score based on job title
-        Max points: 30
+        Calculate component and total scores for a batch of leads
+        Totals are summed and normalized in one NumPy pass over all leads
         """
-        if not title:
-            return 0.0
+        if not leads:
+            return []
+        
+        components = np.array([self._component_scores(lead_data) for lead_data in leads], dtype=np.float64)
+        totals = np.minimum(components.sum(axis=1) / self.total_possible * 100, 100)
         
-        title_lower = title.lower()
-        score = 0.0
-        keywords = self.weights['role_fit']['keywords']
+        keys = COMPONENT_KEYS + ('total_score',)
+        return [dict(zip(keys, row)) for row in np.column_stack((components, totals)).tolist()]
+    
+    def score_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate component and total scores for a DataFrame of leads (one lead per row)
+        Each component is computed column-wise with vectorized string masks instead of per lead
+        Returns a DataFrame with the COMPONENT_KEYS columns and total_score, aligned to df's index
+        """
+        keys = list(COMPONENT_KEYS) + ['total_score']
+        if df.empty:
+            return pd.DataFrame(columns=keys, index=df.index, dtype=np.float64)
+        
+        scores = pd.DataFrame({
+            'role_fit_score': self._role_fit_scores(_lower_column(df, 'title')),
+            'company_intent_score': self._company_intent_scores(df),
+            'technographic_score': self._technographic_scores(df),
+            # Locations have few distinct values, so map each through the cached scorer
+            'location_score': _lower_column(df, 'person_location').map(
+                lambda location: _location_score(location) if location else LOCATION_SCORES['Other']
+            ).astype(np.float64),
+            'scientific_intent_score': [
+                self.calculate_scientific_intent_score({'publications': pubs, 'conference_participation': conference})
+                for pubs, conference in zip(_object_column(df, 'publications'), _object_column(df, 'conference_participation'))
+            ],
+        }, index=df.index)
+        
+        # Normalize the raw totals to a 0-100 scale
+        scores['total_score'] = np.minimum(scores.sum(axis=1) / self.total_possible * 100, 100)
+        return scores
+    
+    def _role_fit_scores(self, titles: pd.Series) -> np.ndarray:
+        """
+        Vectorized calculate_role_fit_score over lowercased titles
+        Titles repeat across leads, so each distinct title gets one matcher pass through the cached scorer
+        """
+        return titles.map(lambda title: _role_fit_score(title) if title else 0.0).to_numpy(dtype=np.float64)
+    
+    def _company_intent_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """Vectorized calculate_company_intent_score"""
+        weights = self.weights['company_intent']
+        stages = _lower_column(df, 'funding_stage')
         
-        # Check for each keyword (take max, not sum, to avoid double counting)
-        keyword_scores = []
+        # Funding year is the leading four digits (e.g. "2025" or "2025-06")
+        years = pd.to_numeric(_lower_column(df, 'funding_date').str.extract(_YEAR_RE, expand=False), errors='coerce')
+        recent = (_CURRENT_YEAR - years <= 1).to_numpy()
         
-        if 'toxicology' in title_lower or 'toxicologist' in title_lower:
-            keyword_scores.append(keywords['toxicology'])
-        if 'safety' in title_lower:
-            keyword_scores.append(keywords['safety'])
-        if 'hepatic' in title_lower:
-            keyword_scores.append(keywords['hepatic'])
-        if 'liver' in title_lower:
-            keyword_scores.append(keywords['liver'])
-        if '3d' in title_lower:
-            keyword_scores.append(keywords['3d'])
-        if 'in vitro' in title_lower or 'in-vitro' in title_lower:
-            keyword_scores.append(keywords['in vitro'])
+        # Look up each funding stage by its categorical code; early rounds score half unless recent
+        codes = pd.Categorical(stages, categories=_FUNDING_STAGES).codes
+        stage_score = _FUNDING_STAGE_POINTS[codes]
+        early = _FUNDING_STAGE_EARLY[codes]
+        stage_score = np.where(early & ~recent, stage_score * 0.5, stage_score)
         
-        # Add base score for topic match
-        if keyword_scores:
-            score += max(keyword_scores)
+        # Check for NIH grants in notes
+        grant = np.where(_lower_column(df, 'notes').str.contains(_GRANT_RE), weights['nih_grant'], 0)
         
-        # Add seniority bonus
-        if any(term in title_lower for term in ['director', 'head', 'vp', 'vice president', 'chief']):
-            score += keywords['director']
-        elif 'principal' in title_lower:
-            score += keywords['director'] * 0.8  # Slightly less than director
-        elif 'scientist' in title_lower:
-            score += keywords['scientist']
+        return np.minimum(stage_score + grant, weights['max_points'])
+    
+    def _technographic_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Vectorized calculate_technographic_score
+        Each lead's keywords get one matcher pass (cached per distinct keywords and company)
+        """
+        return np.fromiter(
+            (
+                _technographic_score(tuple(_parse_json_list(value)), company)
+                for value, company in zip(_object_column(df, 'tech_keywords_found'), _lower_column(df, 'company'))
+            ),
+            dtype=np.float64,
+            count=len(df),
+        )
+    
+    def _component_scores(self, lead_data: Dict) -> Tuple[float, float, float, float, float]:
+        """Calculate the five component scores in COMPONENT_KEYS order"""
+        lead = _normalize_lead(lead_data)
+        return (
+            _role_fit_score(lead['title']) if lead['title'] else 0.0,
+            _company_intent_score(lead['funding_stage'], lead['funding_date'], lead['has_grant']),
+            _technographic_score(lead['tech_keywords'], lead['company']),
+            _location_score(lead['person_location']) if lead['person_location'] else LOCATION_SCORES['Other'],
+            self.calculate_scientific_intent_score(lead_data),
+        )
+    
+    def calculate_role_fit_score(self, title: str) -> float:
+        """
+        Calculate role fit score based on job title
+        Max points: 30
+        """
+        if not title:
+            return 0.0
         
-        return min(score, self.weights['role_fit']['max_points'])
+        return _role_fit_score(title.lower())
     
     def calculate_company_intent_score(self, lead_data: Dict) -> float:
         """
         Calculate company intent score based on funding and grants
         Max points: 20
         """
-        score = 0.0
-        funding_stage = lead_data.get('funding_stage', '').lower()
-        funding_date = lead_data.get('funding_date', '')
-        
-        # Check funding stage and recency
-        if funding_stage in ['series a', 'series b']:
-            # Check if recent (within 12 months)
-            if self._is_recent_funding(funding_date, months=12):
-                score += self.weights['company_intent']['series_a_b_recent']
-            else:
-                score += self.weights['company_intent']['series_a_b_recent'] * 0.5
-        
-        elif funding_stage in ['series c', 'series d', 'series d+', 'ipo', 'public']:
-            score += self.weights['company_intent']['series_c_plus']
-        
-        elif funding_stage == 'bootstrapped':
-            score += self.weights['company_intent']['bootstrapped']
-        
-        # Check for NIH grants (would be in notes or separate field)
-        notes = lead_data.get('notes', '').lower()
-        if 'nih' in notes or 'grant' in notes:
-            score += self.weights['company_intent']['nih_grant']
-        
-        return min(score, self.weights['company_intent']['max_points'])
+        lead = _normalize_lead(lead_data)
+        return _company_intent_score(lead['funding_stage'], lead['funding_date'], lead['has_grant'])
     
     def calculate_technographic_score(self, lead_data: Dict) -> float:
         """
         Calculate technographic signals score
         Max points: 25
         """
-        score = 0.0
-        
-        # Parse tech keywords found
-        tech_keywords = lead_data.get('tech_keywords_found', '')
-        if isinstance(tech_keywords, str) and tech_keywords:
-            try:
-                tech_keywords = json.loads(tech_keywords)
-            except:
-                tech_keywords = []
-        
-        if not isinstance(tech_keywords, list):
-            tech_keywords = []
-        
-        tech_keywords_lower = [k.lower() for k in tech_keywords]
-        
-        # Check for specific technology mentions
-        if any('3d model' in k or '3d cell' in k for k in tech_keywords_lower):
-            score += self.weights['technographic']['3d_models_mention']
-        
-        if any('nam' in k or 'alternative method' in k for k in tech_keywords_lower):
-            score += self.weights['technographic']['nams_mention']
-        
-        if any('liver' in k or 'hepat' in k for k in tech_keywords_lower):
-            score += self.weights['technographic']['liver_disease_focus']
-        
-        # Check company name for indicators
-        company = lead_data.get('company', '').lower()
-        if any(term in company for term in ['liver', 'hepat', 'organ', 'organoid', 'biotech']):
-            score += 5  # Bonus for relevant company focus
-        
-        return min(score, self.weights['technographic']['max_points'])
+        lead = _normalize_lead(lead_data)
+        return _technographic_score(lead['tech_keywords'], lead['company'])
     
     def calculate_location_score(self, location: str) -> float:
         """
@@ -151,103 +480,25 @@ class PropensityScorer:
         if not location:
             return LOCATION_SCORES['Other']
         
-        location_lower = location.lower()
-        
-        # Check for each hub
-        for hub, score in LOCATION_SCORES.items():
-            if hub.lower() in location_lower:
-                return score
-        
-        # Special cases
-        if 'san francisco' in location_lower or 'sf' in location_lower or 'palo alto' in location_lower:
-            return LOCATION_SCORES['Bay Area']
-        
-        if 'ma' in location_lower or 'massachusetts' in location_lower:
-            # Could be Boston area
-            return LOCATION_SCORES['Boston']
-        
-        return LOCATION_SCORES['Other']
+        return _location_score(location.lower())
     
     def calculate_scientific_intent_score(self, lead_data: Dict) -> float:
         """
         Calculate scientific intent score based on publications and conferences
         Max points: 40
         """
-        score = 0.0
-        
         # Parse publications
-        publications = lead_data.get('publications', '')
-        if isinstance(publications, str) and publications:
-            try:
-                publications = json.loads(publications)
-            except:
-                publications = []
-        
-        if not isinstance(publications, list):
-            publications = []
+        publications = _parse_json_list(lead_data.get('publications', ''))
         
-        # Score based on publication recency
-        recent_count = 0
-        older_count = 0
-        has_3d_culture_paper = False
+        # Score based on publication recency, 3D culture papers and conference participation
+        has_recent, has_older, has_3d_culture_paper = _publication_signals(publications)
+        has_conference = bool(lead_data.get('conference_participation', ''))
         
-        current_year = 2026
-        
-        for pub in publications:
-            # Safely convert year to int, handling empty strings and invalid values
-            year_value = pub.get('year', 0)
-            try:
-                year = int(year_value) if year_value else 0
-            except (ValueError, TypeError):
-                year = 0
-            
-            title = pub.get('title', '').lower()
-            
-            # Check for 3D culture papers
-            if any(term in title for term in ['3d', 'spheroid', 'organoid', 'organ-on-chip']):
-                has_3d_culture_paper = True
-            
-            # Check recency (only if we have a valid year)
-            if year > 0:
-                if year >= current_year - 1:  # Last 12 months
-                    recent_count += 1
-                elif year >= current_year - 2:  # 12-24 months
-                    older_count += 1
-        
-        # Add points for publications
-        if recent_count > 0:
-            score += self.weights['scientific_intent']['publication_recent']
-        elif older_count > 0:
-            score += self.weights['scientific_intent']['publication_older']
-        
-        # Bonus for 3D culture papers
-        if has_3d_culture_paper:
-            score += self.weights['scientific_intent']['3d_culture_paper']
-        
-        # Check for conference participation
-        conference = lead_data.get('conference_participation', '')
-        if conference:
-            score += self.weights['scientific_intent']['conference_presenter']
-        
-        return min(score, self.weights['scientific_intent']['max_points'])
+        return _SCIENTIFIC_INTENT_SCORES[has_recent, has_older, has_3d_culture_paper, has_conference]
     
     def _is_recent_funding(self, funding_date: str, months: int = 12) -> bool:
         """Check if funding date is within specified months"""
-        if not funding_date:
-            return False
-        
-        # Simple check - would need proper date parsing in production
-        try:
-            # Assuming format like "2025" or "2025-06"
-            year = int(funding_date.split('-')[0])
-            current_year = 2026
-            
-            if current_year - year <= 1:
-                return True
-        except:
-            pass
-        
-        return False
+        return _is_recent_funding(funding_date, months)
     
     def get_score_category(self, total_score: float) -> str:
         """Get score category (Hot/Warm/Cold)"""
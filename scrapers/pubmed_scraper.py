@@ -1,14 +1,154 @@
 """
 PubMed scraper for finding researchers in toxicology and 3D cell culture
 """
+import re
+import threading
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from Bio import Entrez
+from lxml import etree
 from config import PUBMED_KEYWORDS, get_settings
+from models import Author, Paper
 
 settings = get_settings()
 Entrez.email = settings.PUBMED_EMAIL
+if settings.NCBI_API_KEY:
+    Entrez.api_key = settings.NCBI_API_KEY
+
+# NCBI allows 3 requests/second without an API key and 10 with one
+NCBI_REQUESTS_PER_SECOND = 10 if settings.NCBI_API_KEY else 3
+
+# Papers per efetch request
+FETCH_BATCH_SIZE = 20
+
+
+# Leading affiliation parts that name a department rather than the institution
+_DEPARTMENT_PREFIXES = ('Department of', 'Division of', 'Center for', 'Institute of')
+
+# State/country/city markers that make an affiliation part look like a location
+_LOCATION_INDICATOR_RE = re.compile('USA|UK|MA|CA|SWITZERLAND|BOSTON|CAMBRIDGE', re.IGNORECASE)
+
+
+# Fields projected out of each <PubmedArticle>, relative to its MedlineCitation/Article
+_XP_TITLE = etree.XPath('string(ArticleTitle)')  # Includes inline markup such as <i>
+_XP_YEAR = etree.XPath('string(Journal/JournalIssue/PubDate/Year)')
+_XP_MONTH = etree.XPath('string(Journal/JournalIssue/PubDate/Month)')
+_XP_AUTHORS = etree.XPath('AuthorList/Author[string(LastName) and string(ForeName)]')
+_XP_ABSTRACT_PARTS = etree.XPath('Abstract/AbstractText')
+_XP_PMID = etree.XPath('string(../PMID)')
+
+# Fields of each <Author>
+_XP_LAST_NAME = etree.XPath('string(LastName)')
+_XP_FORE_NAME = etree.XPath('string(ForeName)')
+_XP_AFFILIATION = etree.XPath('string(AffiliationInfo[1]/Affiliation)')
+
+
+# Punctuation, digits and underscores dropped from names before comparing them
+_NAME_NOISE_RE = re.compile(r'[^\w\s]|[\d_]')
+
+
+def _canon_name(name: str) -> Tuple[str, str]:
+    """
+    Reduce an author name to (first name, last name), lowercased, where the first name
+    may be just an initial, e.g. "Jane A. Smith" -> ("jane", "smith"), "J. Smith" -> ("j", "smith")
+    """
+    parts = _NAME_NOISE_RE.sub('', name).lower().split()
+    if not parts:
+        return '', ''
+    if len(parts) == 1:
+        return '', parts[0]
+    return parts[0], parts[-1]
+
+
+def _match_author(candidates: List[list], first: str) -> Optional[list]:
+    """
+    Find the [first name, lead] among same-initial, same-surname candidates that an author
+    with this first name belongs to, or None for a new person. An initial and a full first
+    name are only paired when the pairing is unambiguous
+    """
+    exact = next((candidate for candidate in candidates if candidate[0] == first), None)
+    if exact is not None:
+        return exact
+    
+    full_names = [candidate for candidate in candidates if len(candidate[0]) > 1]
+    if len(first) <= 1:
+        # "J. Smith" joins the only full-named Smith, never one of several
+        return full_names[0] if len(full_names) == 1 else None
+    
+    # A full name takes over an initial-only lead if no other full name could claim it
+    initial_only = [candidate for candidate in candidates if len(candidate[0]) <= 1]
+    if not full_names and len(initial_only) == 1:
+        return initial_only[0]
+    return None
+
+
+# Current year, and how many years back a paper still counts as recent (as in the scorer)
+_CURRENT_YEAR = datetime.now().year
+RECENT_PUBLICATION_YEARS = 1
+
+
+def _is_recent_publication(year: str) -> bool:
+    """Whether a paper's publication year is within RECENT_PUBLICATION_YEARS of now"""
+    return year.isdecimal() and int(year) >= _CURRENT_YEAR - RECENT_PUBLICATION_YEARS
+
+
+@lru_cache(maxsize=16384)
+def _parse_affiliation(affiliation: str) -> Tuple[str, str]:
+    """
+    Extract (company/institution, location) from an affiliation string in one split
+    Cached, since co-authors and repeat institutions share the same affiliation strings
+    """
+    parts = [part.strip() for part in affiliation.split(',')]
+    
+    # Company: simple extraction - take first part before comma, unless it is a
+    # department-style prefix and the institution name follows
+    company = parts[0]
+    if company.startswith(_DEPARTMENT_PREFIXES) and len(parts) > 1:
+        company = parts[1]
+    
+    # Location: usually in the last few parts; the last part that looks like a
+    # location (contains state/country), else the last part as fallback
+    location = next(
+        (part for part in reversed(parts) if _LOCATION_INDICATOR_RE.search(part)),
+        parts[-1]
+    )
+    
+    return company, location
+
+
+class RateLimiter:
+    """Space out calls across threads to at most rate per second"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until the caller may make its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_ncbi_limiter = RateLimiter(NCBI_REQUESTS_PER_SECOND)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield successive lists of up to size items from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 class PubMedScraper:
@@ -60,179 +200,172 @@ class PubMedScraper:
             print(f"Error searching PubMed: {e}")
             return []
     
-    def fetch_paper_details(self, pubmed_ids: List[str]) -> List[Dict]:
+    def fetch_paper_details(self, pubmed_ids: Iterable[str]) -> Iterator[Paper]:
         """
         Fetch detailed information for papers
-        Returns list of paper details with authors
+        Batches are fetched concurrently (within the NCBI rate limit) and yielded in order
         """
+        paper_count = 0
+        pubmed_ids = list(pubmed_ids)
         if not pubmed_ids:
-            return []
-        
-        papers = []
+            return
         
         try:
-            # Fetch details in batches of 20
-            batch_size = 20
-            for i in range(0, len(pubmed_ids), batch_size):
-                batch = pubmed_ids[i:i + batch_size]
-                
-                handle = Entrez.efetch(
-                    db="pubmed",
-                    id=batch,
-                    rettype="medline",
-                    retmode="xml"
+            # Upload the IDs to the NCBI history server once, so batches only send offsets
+            _ncbi_limiter.wait()
+            handle = Entrez.epost(db="pubmed", id=",".join(pubmed_ids))
+            posted = Entrez.read(handle)
+            handle.close()
+            
+            offsets = range(0, len(pubmed_ids), FETCH_BATCH_SIZE)
+            with ThreadPoolExecutor(max_workers=NCBI_REQUESTS_PER_SECOND) as executor:
+                batches = executor.map(
+                    lambda offset: self._fetch_batch(posted["WebEnv"], posted["QueryKey"], offset),
+                    offsets,
                 )
-                records = Entrez.read(handle)
-                handle.close()
-                
-                for record in records['PubmedArticle']:
-                    paper_info = self._parse_paper_record(record)
-                    if paper_info:
-                        papers.append(paper_info)
-                
-                # Be nice to NCBI servers
-                time.sleep(0.5)
+                for papers in batches:
+                    for paper_info in papers:
+                        paper_count += 1
+                        yield paper_info
             
-            print(f"Fetched details for {len(papers)} papers")
-            return papers
+            print(f"Fetched details for {paper_count} papers")
             
         except Exception as e:
             print(f"Error fetching paper details: {e}")
-            return []
     
-    def _parse_paper_record(self, record) -> Optional[Dict]:
-        """Parse a PubMed record into structured data"""
+    def _fetch_batch(self, webenv: str, query_key: str, retstart: int) -> List[Paper]:
+        """Fetch and parse one batch of posted papers from the history server"""
+        _ncbi_limiter.wait()
+        handle = Entrez.efetch(
+            db="pubmed",
+            webenv=webenv,
+            query_key=query_key,
+            retstart=retstart,
+            retmax=FETCH_BATCH_SIZE,
+            rettype="medline",
+            retmode="xml"
+        )
+        
+        papers = []
         try:
-            article = record['MedlineCitation']['Article']
-            
-            # Extract title
-            title = article.get('ArticleTitle', '')
-            
-            # Extract publication date
-            pub_date = article.get('Journal', {}).get('JournalIssue', {}).get('PubDate', {})
-            year = pub_date.get('Year', '')
-            month = pub_date.get('Month', '01')
-            
-            # Extract authors
-            authors = []
-            author_list = article.get('AuthorList', [])
+            # Parse one <PubmedArticle> at a time straight off the response stream,
+            # without reading the whole batch into memory or building the whole tree
+            for _, elem in etree.iterparse(handle, events=('end',), tag='PubmedArticle'):
+                paper_info = self._parse_paper_record(elem)
+                
+                # Release the parsed article and any siblings already processed
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+                
+                if paper_info:
+                    papers.append(paper_info)
+        finally:
+            handle.close()
+        
+        return papers
+    
+    def _parse_paper_record(self, record) -> Optional[Paper]:
+        """Parse a <PubmedArticle> element into structured data, evaluating one compiled XPath per field"""
+        try:
+            article = record.find('MedlineCitation/Article')
+            if article is None:
+                print("Error parsing paper record: no MedlineCitation/Article")
+                return None
             
-            for author in author_list:
-                if 'LastName' in author and 'ForeName' in author:
-                    name = f"{author['ForeName']} {author['LastName']}"
-                    
-                    # Extract affiliation
-                    affiliation = ""
-                    if 'AffiliationInfo' in author and author['AffiliationInfo']:
-                        affiliation = author['AffiliationInfo'][0].get('Affiliation', '')
-                    
-                    authors.append({
-                        'name': name,
-                        'affiliation': affiliation,
-                        'is_corresponding': False  # Could be enhanced
-                    })
+            # Extract authors with both a first and last name
+            authors = tuple(
+                Author(
+                    name=f"{_XP_FORE_NAME(author)} {_XP_LAST_NAME(author)}",
+                    affiliation=_XP_AFFILIATION(author)
+                )
+                for author in _XP_AUTHORS(article)
+            )
             
             # Extract abstract keywords
-            abstract = article.get('Abstract', {}).get('AbstractText', [])
-            if isinstance(abstract, list):
-                abstract_text = ' '.join([str(a) for a in abstract])
-            else:
-                abstract_text = str(abstract)
+            abstract_text = ' '.join(''.join(part.itertext()) for part in _XP_ABSTRACT_PARTS(article))
             
-            return {
-                'title': title,
-                'year': year,
-                'month': month,
-                'authors': authors,
-                'abstract': abstract_text[:500],  # First 500 chars
-                'pubmed_id': record['MedlineCitation']['PMID']
-            }
+            return Paper(
+                title=_XP_TITLE(article),
+                year=_XP_YEAR(article),
+                month=_XP_MONTH(article) or '01',
+                authors=authors,
+                abstract=abstract_text[:500],  # First 500 chars
+                pubmed_id=_XP_PMID(article)
+            )
             
         except Exception as e:
             print(f"Error parsing paper record: {e}")
             return None
     
-    def extract_leads_from_papers(self, papers: List[Dict]) -> List[Dict]:
+    def extract_leads_from_papers(self, papers: Iterable[Paper]) -> Iterator[Dict]:
         """
         Extract potential leads from paper author lists
         Focus on corresponding authors and those with relevant affiliations
+        Authors are deduped on last name, compatible first name and institution; later papers by
+        the same author are merged into that lead's publications, so leads are yielded once all
+        papers are read
         """
-        leads = []
-        seen_names = set()
+        # (first initial, last name, lowercased company) -> [[first name, lead]]
+        leads = {}
+        lead_count = 0
         
         for paper in papers:
-            for author in paper['authors']:
-                name = author['name']
-                
-                # Skip if we've already seen this person
-                if name in seen_names:
-                    continue
+            publication = paper.publication()
+            is_recent = _is_recent_publication(paper.year)
+            
+            # Match full first names before initials, so an initial on this paper can't take
+            # a lead that a co-author with the full name is about to claim
+            authors = sorted(
+                ((author, *_canon_name(author.name)) for author in paper.authors if author.affiliation),
+                key=lambda entry: len(entry[1]) <= 1
+            )
+            
+            # Leads this paper has been added to; two author slots never share one lead
+            claimed = set()
+            
+            for author, first, last in authors:
+                # Extract company and location from affiliation
+                company, location = _parse_affiliation(author.affiliation)
+                candidates = leads.setdefault((first[:1], last, company.lower()), [])
                 
-                affiliation = author['affiliation']
+                match = _match_author(candidates, first)
+                if match is not None and id(match[1]) in claimed:
+                    if match[0] == first:
+                        continue  # Same author listed twice on one paper
+                    match = None
                 
-                # Skip if no affiliation
-                if not affiliation:
+                # Add the paper to an author we've already seen at the same institution,
+                # taking the full first name if the lead so far only had an initial
+                if match is not None:
+                    seen_first, lead = match
+                    if len(first) > len(seen_first):
+                        match[0] = first
+                        lead['name'] = author.name
+                    if all(pub['pubmed_id'] != paper.pubmed_id for pub in lead['publications']):
+                        lead['publications'].append(publication)
+                        lead['recent_publication_count'] += is_recent
+                    claimed.add(id(lead))
                     continue
                 
-                # Extract company from affiliation
-                company = self._extract_company_from_affiliation(affiliation)
-                
-                # Extract location from affiliation
-                location = self._extract_location_from_affiliation(affiliation)
-                
                 lead = {
-                    'name': name,
+                    'name': author.name,
                     'title': 'Research Scientist',  # Default, will be enriched
                     'company': company,
                     'person_location': location,
                     'company_hq': location,
-                    'publications': [{
-                        'title': paper['title'],
-                        'year': paper['year'],
-                        'pubmed_id': paper['pubmed_id']
-                    }],
-                    'recent_publication_count': 1,
+                    'publications': [publication],
+                    'recent_publication_count': int(is_recent),
                     'data_source': 'PubMed',
                 }
-                
-                leads.append(lead)
-                seen_names.add(name)
-        
-        print(f"Extracted {len(leads)} unique leads from papers")
-        return leads
-    
-    def _extract_company_from_affiliation(self, affiliation: str) -> str:
-        """Extract company/institution name from affiliation string"""
-        # Simple extraction - take first part before comma
-        parts = affiliation.split(',')
-        if parts:
-            company = parts[0].strip()
-            # Remove common prefixes
-            for prefix in ['Department of', 'Division of', 'Center for', 'Institute of']:
-                if company.startswith(prefix):
-                    # Try to get the institution name from later parts
-                    if len(parts) > 1:
-                        return parts[1].strip()
-            return company
-        return "Unknown"
-    
-    def _extract_location_from_affiliation(self, affiliation: str) -> str:
-        """Extract location from affiliation string"""
-        # Look for common location patterns
-        parts = affiliation.split(',')
-        
-        # Usually location is in the last few parts
-        for part in reversed(parts):
-            part = part.strip()
-            # Check if it looks like a location (contains state/country)
-            if any(indicator in part.upper() for indicator in ['USA', 'UK', 'MA', 'CA', 'SWITZERLAND', 'BOSTON', 'CAMBRIDGE']):
-                return part
-        
-        # Return last part as fallback
-        if parts:
-            return parts[-1].strip()
+                candidates.append([first, lead])
+                claimed.add(id(lead))
+                lead_count += 1
         
-        return "Unknown"
+        print(f"Extracted {lead_count} unique leads from papers")
+        for candidates in leads.values():
+            for _, lead in candidates:
+                yield lead
 
 
 def main():
@@ -246,11 +379,11 @@ def main():
     if paper_ids:
         # Fetch paper details
         print("\nFetching paper details...")
-        papers = scraper.fetch_paper_details(paper_ids)
+        papers = list(scraper.fetch_paper_details(paper_ids))
         
         # Extract leads
         print("\nExtracting leads from papers...")
-        leads = scraper.extract_leads_from_papers(papers)
+        leads = list(scraper.extract_leads_from_papers(papers))
         
         # Display sample leads
         print(f"\n=== Sample Leads (showing first 5) ===")